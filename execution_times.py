@@ -1,108 +1,225 @@
-"""Code to measure the influence of difficulty on mining time """
-
-from objects.utilisateur import Utilisateur
-from objects.transaction import Transaction
-from objects.mineur import Mineur
-from objects.bloc import Bloc
-from typing import List
+"""Code to measure the influence of difficulty on mining time
+
+Étude statistique du minage, en ligne de commande et sans affichage :
+- balayage des difficultés (zéros hexadécimaux) et du nombre de processus de minage, une combinaison après l'autre
+  (les échantillons à 1 processus sont répartis sur un pool, ceux à plusieurs processus occupent déjà les cœurs)
+- headers entièrement tirés de la graine (timestamp compris) : même graine, mêmes tentatives et mêmes tests
+  à 1 processus (à plusieurs, le nombre de tentatives dépend aussi de l'ordonnancement des processus)
+- échantillons en nombre suffisant pour un intervalle de confiance à 95 % sur le nombre moyen de tentatives
+- comparaison de la distribution des tentatives à la loi géométrique théorique (moyenne 16^d) : test de Kolmogorov-Smirnov
+  (à 1 processus de minage seulement : à plusieurs, les lignes ne mesurent que le débit)
+- résultats en CSV et/ou JSON, graphique optionnel écrit dans un fichier (matplotlib)
+
+Exemple : python execution_times.py --difficultes 1 2 3 4 --travailleurs 1 2 --csv etude.csv --json etude.json
+"""
+
+from objects.bloc import FORMAT_PREFIXE, VERSION
+from objects.difficulte import bits_depuis_zeros, bits_vers_cible
+from objects.minage import MoteurMinage, NONCE_MAX, obtenir_backend
+from objects.telemetrie import StatistiquesMineur
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import csv
+import json
+import math
+import os
 import random
+import statistics
 import time
-import matplotlib.pyplot as plt
-from matplotlib.ticker import MaxNLocator
-import numpy as np
-
-
-
-
-
-# Configuration
-difficulte = 5
-recompense_bloc = 3.125
-max_transactions_par_bloc = 10
-
-# Créer 10 utilisateurs
-noms = ["Alice", "Bob", "Charlie", "Diana", "Eve", "Frank", "Satoshi", "Henry", "Iris", "Jack"]
-utilisateurs = [Utilisateur(nom) for nom in noms]
-
-# Créer 4 mineurs
-mineurs = [
-    Mineur("Mineur_Alpha"),
-    Mineur("Mineur_Beta"),
-    Mineur("Mineur_Gamma"),
-    Mineur("Mineur_Delta")
-]
-
-# Initialiser la blockchain
-blockchain: List[Bloc] = []
-bloc_genesis = mineurs[0].creer_bloc_genesis(utilisateurs)
-blockchain.append(bloc_genesis)
-
-# Liste des transactions en attente
-mempool: List[Transaction] = []
-
-
-
-expediteur = random.choice(utilisateurs)
-destinataire = random.choice([u for u in utilisateurs if u != expediteur])
-montant = 1
-tx = Transaction(expediteur, destinataire, montant, expediteur.cle_publique_hex)
-expediteur.signe(tx)
-mempool.append(tx)
-
-
-    
-
-
-
-
-n = 4
-exec_times: List[List] = []
-
-for i in range(1, n+1):
-    print(f"\n\nItération {i}/{n}\n")
-    exec_times_i = []
-    for _ in range(10):
-        start = time.time()
-        bloc = mineurs[0].miner_bloc(
-            transactions_en_attente=mempool,
-            hash_dernier_bloc=blockchain[-1].hash,
-            index_bloc=len(blockchain),
-            difficulte=i,
-        )
-        exec_times_i.append(time.time() - start)
-    exec_times.append(exec_times_i)
-
-
-
-
-
-
-# Calculer la moyenne/min/max sur les temps d'exécution
-means = [np.mean(t) for t in exec_times]
-stds = [np.std(t) for t in exec_times]
-mins = [min(t) for t in exec_times]
-maxs = [max(t) for t in exec_times]
-x = np.arange(1, len(exec_times) + 1)
-
-fig, ax = plt.subplots()
-
-# Afficher l'écart-type des temps d'exécution sous forme de barre verticale
-for i, (xi, mean, std, min_val, max_val) in enumerate(zip(x, means, stds, mins, maxs)):
-    ax.vlines(xi, max(min_val, mean - std), min(max_val, mean + std), color='purple', alpha=0.7, linewidth=2, label="Moyenne ± Écart-type" if i == 0 else "")
-
-# Scatter sur min/max
-ax.scatter(x, mins, color='tab:red', marker='_', s=100, label="Min" if any(mins) else "")
-ax.scatter(x, maxs, color='tab:green', marker='_', s=100, label="Max" if any(maxs) else "")
 
-ax.xaxis.set_major_locator(MaxNLocator(integer=True))
-ax.plot(x, means, marker='o', label="Durée Moyenne", color="tab:blue")
-ax.set_yscale('log')
-ax.set_xlabel('Difficulté')
-ax.set_ylabel('Durée (en s)')
-ax.tick_params(axis='y')
-ax.legend()
-plt.grid(True, which="both", ls="-", alpha=0.5)
-plt.title("Durée moyenne & écarts types")
-# plt.savefig("images/execution_times_difficulty_log.png")
-plt.show()
 
+Z_95 = 1.959964
+
+
+def entete_aleatoire(aleatoire, bits):
+    """ Préfixe de header au format des blocs, avec hash précédent, racine de Merkle et timestamp tirés de `aleatoire` """
+    return FORMAT_PREFIXE.pack(VERSION, aleatoire.randbytes(32), aleatoire.randbytes(32), aleatoire.getrandbits(32), bits)
+
+
+def miner_echantillon(difficulte, graine, backend="hashlib", taille_lot=10_000):
+    """ Un minage complet dans ce processus, à partir du nonce 0 : retourne (tentatives, durée en secondes) """
+    aleatoire = random.Random(graine)
+    bits = bits_depuis_zeros(difficulte)
+    cible = bits_vers_cible(bits).to_bytes(32, 'big')
+    Recherche = obtenir_backend(backend)
+    tentatives = 0
+    debut = time.perf_counter()
+    while True:
+        recherche = Recherche(entete_aleatoire(aleatoire, bits))
+        for lot in range(0, NONCE_MAX, taille_lot):
+            trouve = recherche.chercher(cible, lot, min(lot + taille_lot, NONCE_MAX))
+            if trouve is not None:
+                return tentatives + trouve[0] - lot + 1, time.perf_counter() - debut
+            tentatives += min(taille_lot, NONCE_MAX - lot)
+
+
+def _miner_lot(taches):
+    return [miner_echantillon(*tache) for tache in taches]
+
+
+def echantillons_sequentiels(difficulte, nb_echantillons, graine, backend, nb_processus):
+    """ Échantillons à 1 processus de minage, répartis sur un pool de `nb_processus` (minages indépendants) """
+    taches = [(difficulte, f"{graine}/{difficulte}/{i}", backend) for i in range(nb_echantillons)]
+    if nb_processus == 1:
+        return _miner_lot(taches)
+    taille = max(1, len(taches) // (4 * nb_processus))
+    lots = [taches[i:i + taille] for i in range(0, len(taches), taille)]
+    with ProcessPoolExecutor(max_workers=nb_processus) as executeur:
+        return [resultat for lot in executeur.map(_miner_lot, lots) for resultat in lot]
+
+
+def echantillons_paralleles(difficulte, nb_echantillons, graine, backend, nb_travailleurs):
+    """
+    Échantillons minés par un MoteurMinage de `nb_travailleurs` processus : les tentatives comptent
+    tous les hashs calculés jusqu'à l'arrêt, y compris les lots terminés par les processus perdants
+    après la découverte (elles mesurent le débit, pas la loi du nombre d'essais)
+    """
+    aleatoire = random.Random(f"{graine}/{difficulte}/{nb_travailleurs}")
+    bits = bits_depuis_zeros(difficulte)
+    cible = bits_vers_cible(bits).to_bytes(32, 'big')
+    resultats = []
+    with MoteurMinage(nb_travailleurs, backend=backend) as moteur:
+        for _ in range(nb_echantillons):
+            statistiques = StatistiquesMineur("etude")
+            debut = time.perf_counter()
+            moteur.miner([entete_aleatoire(aleatoire, bits)], cible, statistiques=[statistiques])
+            resultats.append((statistiques.tentatives, time.perf_counter() - debut))
+    return resultats
+
+
+def intervalle(valeurs):
+    """ Moyenne et demi-largeur de son intervalle de confiance à 95 % (approximation normale) """
+    moyenne = statistics.fmean(valeurs)
+    if len(valeurs) < 2:
+        return moyenne, float('inf')
+    return moyenne, Z_95 * statistics.stdev(valeurs) / math.sqrt(len(valeurs))
+
+
+def ecart_geometrique(tentatives, p):
+    """
+    Statistique de Kolmogorov-Smirnov entre les tentatives observées et la loi géométrique de paramètre p
+    (probabilité qu'un hash soit sous la cible), et sa valeur critique au seuil de 5 %
+    """
+    valeurs = sorted(tentatives)
+    n = len(valeurs)
+    ecart = 0.0
+    for i, k in enumerate(valeurs):
+        theorique = 1 - (1 - p) ** k
+        ecart = max(ecart, abs((i + 1) / n - theorique), abs(i / n - theorique))
+    return ecart, 1.358 / math.sqrt(n)
+
+
+def analyser(difficulte, nb_travailleurs, resultats):
+    """ Ligne de résultats ; le rapport à la théorie et le test géométrique ne portent que sur les lignes à 1 processus """
+    tentatives = [t for t, _ in resultats]
+    durees = [d for _, d in resultats]
+    cible = bits_vers_cible(bits_depuis_zeros(difficulte))
+    p = (cible + 1) / 2 ** 256
+    moyenne, marge = intervalle(tentatives)
+    duree, marge_duree = intervalle(durees)
+    # À plusieurs processus, les hashs des lots perdants gonflent les tentatives : pas de comparaison à la loi géométrique
+    ks, critique = ecart_geometrique(tentatives, p) if nb_travailleurs == 1 else (None, None)
+    return {
+        'difficulte': difficulte,
+        'travailleurs': nb_travailleurs,
+        'echantillons': len(resultats),
+        'tentatives_theoriques': 1 / p,
+        'tentatives_moyennes': moyenne,
+        'tentatives_ic95': marge,
+        'tentatives_mediane': statistics.median(tentatives),
+        'rapport_theorique': moyenne * p if nb_travailleurs == 1 else None,
+        'duree_moyenne': duree,
+        'duree_ic95': marge_duree,
+        'duree_mediane': statistics.median(durees),
+        'hashs_par_seconde': sum(tentatives) / sum(durees) if sum(durees) > 0 else 0.0,
+        'ks': ks,
+        'ks_critique': critique,
+        'conforme_geometrique': ks <= critique if ks is not None else None,
+    }
+
+
+def etudier(difficultes, travailleurs, nb_echantillons, graine=0, backend="hashlib", nb_processus=None):
+    """
+    Balayage difficulté x nombre de processus de minage, combinaison par combinaison,
+    retourne une ligne de résultats par combinaison
+    """
+    nb_processus = nb_processus or os.cpu_count() or 1
+    lignes = []
+    for difficulte in difficultes:
+        for nb_travailleurs in travailleurs:
+            debut = time.perf_counter()
+            if nb_travailleurs == 1:
+                resultats = echantillons_sequentiels(difficulte, nb_echantillons, graine, backend, nb_processus)
+            else:
+                resultats = echantillons_paralleles(difficulte, nb_echantillons, graine, backend, nb_travailleurs)
+            ligne = analyser(difficulte, nb_travailleurs, resultats)
+            lignes.append(ligne)
+            test = f"KS {ligne['ks']:.3f} / {ligne['ks_critique']:.3f}" if ligne['ks'] is not None else "débit seul"
+            print(f"⛏️ d={difficulte} x{nb_travailleurs} : {ligne['tentatives_moyennes']:,.0f} ± {ligne['tentatives_ic95']:,.0f} "
+                  f"tentatives (théorie {ligne['tentatives_theoriques']:,.0f}), {ligne['duree_moyenne'] * 1000:,.1f} ms, "
+                  f"{ligne['hashs_par_seconde']:,.0f} hashs/s, {test} ({time.perf_counter() - debut:.1f} s)")
+    return lignes
+
+
+def ecrire_csv(lignes, fichier):
+    with open(fichier, 'w', newline='', encoding='utf-8') as f:
+        ecrivain = csv.DictWriter(f, fieldnames=list(lignes[0]))
+        ecrivain.writeheader()
+        ecrivain.writerows(lignes)
+
+
+def tracer(lignes, fichier):
+    """ Durée moyenne (avec IC à 95 %) par difficulté, une courbe par nombre de processus, écrite dans `fichier` """
+    # Import à la demande : matplotlib n'est nécessaire que pour le graphique, sans fenêtre (backend Agg)
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.ticker import MaxNLocator
+
+    fig, ax = plt.subplots()
+    for nb_travailleurs in sorted({ligne['travailleurs'] for ligne in lignes}):
+        serie = [ligne for ligne in lignes if ligne['travailleurs'] == nb_travailleurs]
+        ax.errorbar([ligne['difficulte'] for ligne in serie], [ligne['duree_moyenne'] for ligne in serie],
+                    yerr=[ligne['duree_ic95'] for ligne in serie], marker='o', capsize=3,
+                    label=f"{nb_travailleurs} processus")
+    ax.xaxis.set_major_locator(MaxNLocator(integer=True))
+    ax.set_yscale('log')
+    ax.set_xlabel('Difficulté')
+    ax.set_ylabel('Durée (en s)')
+    ax.legend()
+    ax.grid(True, which="both", ls="-", alpha=0.5)
+    ax.set_title("Durée moyenne de minage (IC 95 %)")
+    fig.savefig(fichier)
+    plt.close(fig)
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Étude statistique du temps de minage selon la difficulté")
+    parser.add_argument("--difficultes", type=int, nargs="+", default=[1, 2, 3, 4], help="zéros hexadécimaux")
+    parser.add_argument("--travailleurs", type=int, nargs="+", default=[1], help="processus de minage par échantillon")
+    parser.add_argument("--echantillons", type=int, default=None, help="échantillons par combinaison")
+    parser.add_argument("--precision", type=float, default=0.1,
+                        help="demi-largeur relative visée de l'IC à 95 %% (fixe le nombre d'échantillons par défaut)")
+    parser.add_argument("--processus", type=int, default=None, help="pool des échantillons à 1 processus de minage")
+    parser.add_argument("--backend", choices=["hashlib", "numpy"], default="hashlib")
+    parser.add_argument("--graine", type=int, default=0)
+    parser.add_argument("--csv", default=None, help="fichier CSV des résultats")
+    parser.add_argument("--json", default=None, help="fichier JSON des résultats")
+    parser.add_argument("--graphique", default=None, help="fichier image du graphique (matplotlib)")
+    args = parser.parse_args(arguments)
+
+    # Loi géométrique : écart-type ≈ moyenne, d'où n = (z / précision)^2 pour l'IC visé
+    nb_echantillons = args.echantillons or math.ceil((Z_95 / args.precision) ** 2)
+    lignes = etudier(args.difficultes, args.travailleurs, nb_echantillons, args.graine, args.backend, args.processus)
+    if args.csv:
+        ecrire_csv(lignes, args.csv)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'echantillons': nb_echantillons, 'graine': args.graine, 'resultats': lignes}, f, indent=2)
+    if args.graphique:
+        tracer(lignes, args.graphique)
+    return lignes
+
+
+if __name__ == "__main__":
+    main()
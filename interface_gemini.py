@@ -3,10 +3,14 @@ import math
 import random
 import threading
 import time
-from objects.utilisateur import Utilisateur
+from objects.utilisateur import Utilisateur, RECOMPENSE
 from objects.transaction import Transaction
 from objects.mineur import Mineur
 from objects.bloc import Bloc
+from objects.blockchain import Blockchain
+from objects.verification import verifier_transaction
+from objects.mempool import Mempool
+from objects.journal import configurer_journal
 
 
 # Configuration de l'interface
@@ -65,7 +69,7 @@ class InterfaceVisuelle:
         ]
         
         # Créer la blockchain
-        self.blockchain: List[Bloc] = []
+        self.blockchain = Blockchain()
         bloc_genesis = self.mineurs[0].creer_bloc_genesis(self.utilisateurs)
         self.blockchain.append(bloc_genesis)
         
@@ -90,7 +94,7 @@ class InterfaceVisuelle:
         self.intervalle_transaction = 2.0
         
         # Bloc temporaire
-        self.transactions_bloc_actuel = []
+        self.transactions_bloc_actuel = Mempool(taille_max=1000)
         self.max_transactions_par_bloc = 10
         
         # État du minage
@@ -114,18 +118,21 @@ class InterfaceVisuelle:
         expediteur = random.choice(self.utilisateurs)
         destinataire = random.choice([u for u in self.utilisateurs if u != expediteur])
         
-        # Montant aléatoire entre 0.1 et 5 BTC
+        # Montant aléatoire entre 0.1 et 5 BTC, frais entre 0.00005 et 0.0005 BTC
         montant = round(random.uniform(0.1, 5.0), 2)
+        frais = round(random.uniform(0.00005, 0.0005), 6)
         
         # Vérifier que l'expéditeur a assez de fonds
-        if self.mineurs[0].calculer_solde(self.blockchain, expediteur.cle_publique) < montant:
-            montant = round(self.mineurs[0].calculer_solde(self.blockchain, expediteur.cle_publique) * 0.5, 2)
+        if self.mineurs[0].calculer_solde(self.blockchain, expediteur.cle_publique_hex) < montant + frais:
+            montant = round(self.mineurs[0].calculer_solde(self.blockchain, expediteur.cle_publique_hex) * 0.5, 2)
             if montant < 0.1:
                 return None
         
         # Créer et signer la transaction
-        tx = Transaction(expediteur, destinataire, montant, expediteur.cle_publique_hex)
+        tx = Transaction(expediteur, destinataire, montant, expediteur.cle_publique_hex, frais)
         tx.signature = expediteur.signe(tx)
+        if not verifier_transaction(tx):
+            return None
         
         # Ajouter l'animation
         idx_exp = self.utilisateurs.index(expediteur)
@@ -146,32 +153,35 @@ class InterfaceVisuelle:
         self.minage_en_cours = True
         self.minage_resultats = {}
         self.minage_threads = []
+
+        # Modèle de bloc commun : les transactions aux meilleurs frais du mempool, sélectionnées une seule fois
+        # (le mempool n'est pas protégé contre les accès concurrents des threads de minage)
+        transactions = self.transactions_bloc_actuel.select_for_block(self.max_transactions_par_bloc)
         
         for i, mineur in enumerate(self.mineurs):
             thread = threading.Thread(
                 target=self._miner_bloc_thread,
-                args=(i, mineur)
+                args=(i, mineur, transactions)
             )
             thread.daemon = True
             thread.start()
             self.minage_threads.append(thread)
     
-    def _miner_bloc_thread(self, mineur_id, mineur):
-        """Thread de minage pour un mineur"""
-        # Créer la transaction de récompense
+    def _miner_bloc_thread(self, mineur_id, mineur, transactions):
+        """Thread de minage pour un mineur, sur le modèle de bloc `transactions`"""
+        # Calculer les frais
+        frais_totaux = sum(tx.frais for tx in transactions)
+
+        # Créer la transaction de récompense (le hash couvre le montant frais compris)
         transaction_recompense = Transaction(
-            expediteur=Utilisateur("RECOMPENSE"),
+            expediteur=RECOMPENSE,
             destinataire=mineur,
-            montant=self.recompense_bloc,
+            montant=self.recompense_bloc + frais_totaux,
             cle_publique_expediteur="SYSTEM"
         )
         
-        # Calculer les frais
-        frais_totaux = sum(0.0001 for _ in self.transactions_bloc_actuel)
-        transaction_recompense.montant += frais_totaux
-        
         # Créer le bloc
-        toutes_transactions = [transaction_recompense] + self.transactions_bloc_actuel
+        toutes_transactions = [transaction_recompense] + transactions
         
         bloc = Bloc(
             index=len(self.blockchain),
@@ -181,16 +191,24 @@ class InterfaceVisuelle:
         )
         
         # Miner (Proof of Work)
-        cible = '0' * self.difficulte
         tentatives = 0
+        publiees = 0
         nonce = 0
+        stats = mineur.statistiques
+        stats.demarrer_bloc()
         
         while self.minage_en_cours:
             hash = mineur.calculer_hash(bloc, nonce)
+            tentatives += 1
         
-            if hash.startswith(cible):
+            if int(hash, 16) <= bloc.cible:
                 # Succès !
+                bloc.nonce = nonce
                 bloc.hash = hash
+                # Lot en cours, solution comprise, publié avant de signaler la solution
+                stats.publier(tentatives - publiees, nonce)
+                publiees = tentatives
+                stats.solution_trouvee()
                 with self.minage_lock:
                     if self.minage_en_cours:
                         self.minage_en_cours = False
@@ -203,7 +221,15 @@ class InterfaceVisuelle:
                         self.animation.mineur_gagnant_timer = time.time()
                 break
             
+            # Publication des compteurs par lots (lus sans verrou par la boucle d'affichage)
+            if tentatives - publiees == mineur.taille_lot:
+                stats.publier(mineur.taille_lot, nonce)
+                publiees = tentatives
             nonce += 1
+
+        # Arrêt (un autre mineur a trouvé) : les tentatives du lot entamé sont publiées aussi
+        if tentatives > publiees:
+            stats.publier(tentatives - publiees, nonce - 1)
     
     def dessiner_utilisateur(self, position, utilisateur, index):
         """Dessine un utilisateur"""
@@ -220,7 +246,7 @@ class InterfaceVisuelle:
         self.ecran.blit(texte_nom, rect_nom)
         
         # Solde
-        texte_solde = self.font_petit.render(f"{self.mineurs[0].calculer_solde(self.blockchain, utilisateur.cle_publique):.1f} BTC", True, BLANC)
+        texte_solde = self.font_petit.render(f"{self.mineurs[0].calculer_solde(self.blockchain, utilisateur.cle_publique_hex):.1f} BTC", True, BLANC)
         rect_solde = texte_solde.get_rect(center=(x, y + 15))
         self.ecran.blit(texte_solde, rect_solde)
     
@@ -294,7 +320,7 @@ class InterfaceVisuelle:
         
         # Liste des transactions
         y_tx = y + 130
-        for i, tx in enumerate(self.transactions_bloc_actuel[-8:]):
+        for i, tx in enumerate(list(self.transactions_bloc_actuel)[-8:]):
             for util in self.utilisateurs:
                 if util.cle_publique == tx.destinataire.cle_publique:
                     destinataire = util.nom
@@ -341,13 +367,14 @@ class InterfaceVisuelle:
             self.ecran.blit(nom_texte, rect_nom)
             
             # Solde
-            solde_texte = self.font_petit.render(f"{self.mineurs[0].calculer_solde(self.blockchain, mineur.cle_publique):.2f} BTC", True, couleur_texte)
+            solde_texte = self.font_petit.render(f"{self.mineurs[0].calculer_solde(self.blockchain, mineur.cle_publique_hex):.2f} BTC", True, couleur_texte)
             rect_solde = solde_texte.get_rect(center=(x + largeur // 2, y + 50))
             self.ecran.blit(solde_texte, rect_solde)
             
             # État
             if self.minage_en_cours:
-                etat_texte = self.font_petit.render("Mining...", True, ORANGE)
+                hashrate = mineur.statistiques.hashrate(1.0)
+                etat_texte = self.font_petit.render(f"Mining... {hashrate / 1000:.0f} kH/s", True, ORANGE)
             else:
                 etat_texte = self.font_petit.render("Minage off", True, GRIS)
             rect_etat = etat_texte.get_rect(center=(x + largeur // 2, y + 75))
@@ -470,7 +497,7 @@ class InterfaceVisuelle:
             if len(self.transactions_bloc_actuel) < self.max_transactions_par_bloc:
                 tx = self.creer_transaction_aleatoire()
                 if tx:
-                    self.transactions_bloc_actuel.append(tx)
+                    self.transactions_bloc_actuel.ajouter(tx)
                     self.dernier_temps_transaction = temps_actuel
                     
                     # Si le bloc est plein, lancer le minage
@@ -497,7 +524,7 @@ class InterfaceVisuelle:
                 self.blockchain.append(bloc)
                 
                 self.animation.bloc_vers_blockchain = None
-                self.transactions_bloc_actuel = []
+                self.transactions_bloc_actuel.retirer_bloc(bloc)
                 self.minage_resultats = {}
                 self.animation.mineur_gagnant = None
         
@@ -576,6 +603,7 @@ class InterfaceVisuelle:
 
 
 def main():
+    configurer_journal()
     interface = InterfaceVisuelle()
     interface.run()
 
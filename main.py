@@ -1,145 +1,596 @@
 from objects.utilisateur import Utilisateur
 from objects.transaction import Transaction
-from objects.bloc import Bloc
+from objects.blockchain import Blockchain
+from objects.arbre_blocs import ArbreBlocs
 from objects.mineur import Mineur
 from objects.prints import afficher_soldes, sauvegarder_blockchain
+from objects.minage import MoteurMinage
+from objects.verification import VerificateurSignatures, verifier_transaction
+from objects.mempool import Mempool
+from objects.difficulte import Reciblage, bits_depuis_zeros, cible_octets
+from objects.stockage import StockageBlocs
+from objects.instantane import ecrire_instantane, dernier_instantane, lister_instantanes
+from objects.evenements import FileEvenements, taux_decouverte
+from objects.reseau import Reseau
+from objects.trousseau import TrousseauCles
+from objects.telemetrie import Histogramme
+from objects.metriques import ServeurMetriques, BORNES_VALIDATION
+from objects import traceur
+from objects.journal import configurer_journal, STYLES
+from objects.charge import GenerateurCharge, loi_uniforme, lire_charge
 from typing import List
+import argparse
+import logging
+import os
 import random
+import sys
 import threading
 import time
 
 
+logger = logging.getLogger(__name__)
+
+
 
 class Simulation:
-    def __init__(self):
-        # Configuration
-        self.difficulte = 5
-        self.recompense_bloc = 3.125
-        self.max_transactions_par_bloc = 10
+    def __init__(self, mode_minage="threads", nb_processus=None, backend="hashlib", dossier_donnees=None, colonnes=False,
+                 hashrates=None, graine=None):
+        self._configurer(mode_minage, nb_processus, backend, dossier_donnees, graine)
         
+        # Clés dérivées de la graine si elle est fournie (et gardées dans le dossier de données)
+        trousseau = TrousseauCles(os.path.join(dossier_donnees, "cles.json")) if dossier_donnees and graine is not None else None
+
         # Créer 10 utilisateurs
-        self.noms = ["Alice", "Bob", "Charlie", "Diana", "Eve", "Frank", "Satoshi", "Henry", "Iris", "Jack"]
-        self.utilisateurs = [Utilisateur(nom) for nom in self.noms]
+        self.utilisateurs = [Utilisateur(nom, graine=graine, trousseau=trousseau) for nom in self.noms]
         
-        # Créer 4 mineurs
+        # Créer 4 mineurs (ou un mineur par hashrate déclaré, pour la simulation à événements discrets)
+        if hashrates is None:
+            noms_mineurs, hashrates = ["Mineur_Alpha", "Mineur_Beta", "Mineur_Gamma", "Mineur_Delta"], [1_000_000] * 4
+        else:
+            noms_mineurs = [f"Mineur_{i + 1}" for i in range(len(hashrates))]
         self.mineurs = [
-            Mineur("Mineur_Alpha"),
-            Mineur("Mineur_Beta"),
-            Mineur("Mineur_Gamma"),
-            Mineur("Mineur_Delta")
+            Mineur(nom, backend=backend, hashrate=h, graine=graine, trousseau=trousseau)
+            for nom, h in zip(noms_mineurs, hashrates)
         ]
+        if trousseau is not None:
+            trousseau.fermer()
 
-        # Initialiser la blockchain
-        self.blockchain: List[Bloc] = []
-        bloc_genesis = self.mineurs[0].creer_bloc_genesis(self.utilisateurs)
+        # Initialiser la blockchain (écrite bloc par bloc dans `dossier_donnees` si fourni)
+        self.stockage = StockageBlocs(dossier_donnees, reinitialiser=True) if dossier_donnees else None
+        for ancien in lister_instantanes(dossier_donnees) if dossier_donnees else []:
+            os.remove(ancien)
+        self.blockchain = Blockchain(stockage=self.stockage, registre=self._registre() if colonnes else None)
+        bloc_genesis = self.mineurs[0].creer_bloc_genesis(self.utilisateurs, self.aleatoire)
         self.blockchain.append(bloc_genesis)
-        print(f"✅ Bloc ajouté à la blockchain: {bloc_genesis}\n")
+        self.arbre = ArbreBlocs(self.blockchain, valider=self._valider)
+        logger.info(f"✅ Bloc ajouté à la blockchain: {bloc_genesis}\n")
         afficher_soldes(self)
         
-        # Liste des transactions en attente
-        self.mempool: List[Transaction] = []
+        # Transactions en attente, par ordre de priorité des frais
+        self.mempool = Mempool(taille_max=1000)
+        self.sauvegarder_instantane()
+
+
+    def _configurer(self, mode_minage, nb_processus, backend, dossier_donnees, graine=None):
+        # Configuration
+        self.difficulte = 5  # Difficulté initiale (nombre de zéros hexadécimaux)
+        self.recompense_bloc = 3.125
+        self.max_transactions_par_bloc = 10
+        
+        # Ajustement de la cible tous les 5 blocs pour viser un bloc toutes les 10 secondes
+        self.temps_bloc_cible = 10.0
+        self.reciblage = Reciblage(bits_depuis_zeros(self.difficulte), self.temps_bloc_cible, intervalle=5)
+        self.bits = self.reciblage.bits_initiaux
+        self.noms = ["Alice", "Bob", "Charlie", "Diana", "Eve", "Frank", "Satoshi", "Henry", "Iris", "Jack"]
+        self.backend = backend
+
+        # Instantané de l'état (soldes, mempool, clés) tous les 10 blocs, pour une reprise rapide
+        self.dossier_donnees = dossier_donnees
+        self.intervalle_instantanes = 10
+        
+        self.transactions_bloc: List[Transaction] = []
         
-        # État du minage
+        # Pause après chaque transaction créée (0 en mode sans interface)
+        self.pause_transactions = 0.5
+        self.transactions_creees = 0
+        # Flux de transactions déjà signées (objects.charge) utilisé avant les transactions aléatoires
+        self.source_transactions = None
+
+        # État du minage (fin_minage est signalé dès qu'un bloc gagnant est trouvé, sans attente active)
         self.minage_threads = []
         self.minage_en_cours = False
+        # Numéro du tour de minage : un thread d'un tour précédent s'arrête et ne publie pas son bloc
+        self.tour_minage = 0
+        self.fin_minage = threading.Event()
         self.minage_lock = threading.Lock()
         self.bloc_gagnant = None
 
+        # Mode "evenements" : pas de Proof of Work, la découverte des blocs est tirée au sort en temps simulé
+        # (en moyenne `debit_transactions` nouvelles transactions par seconde simulée)
+        self.mode_minage = mode_minage
+        self.debit_transactions = 1.0
+        # Signatures simulées (transactions non signées, non vérifiées), comme la preuve de travail : mode "evenements" seulement
+        self.signatures_simulees = False
+        self.graine = graine
+        # Tirages de la simulation (soldes initiaux, transactions aléatoires), reproductibles avec une graine
+        self.aleatoire = random.Random(graine)
+
+        # Mode "processus" : la Proof of Work et la vérification des signatures sont réparties sur des pools de processus
+        self.nb_processus = nb_processus
+        self.moteur_minage = MoteurMinage(nb_processus, backend=backend) if mode_minage == "processus" else None
+        self.verificateur = VerificateurSignatures(nb_processus) if mode_minage == "processus" else None
+
+        # Endpoint /metrics optionnel (servir_metriques) et durées de validation qu'il expose
+        self.serveur_metriques = None
+        self.latences_validation = Histogramme(BORNES_VALIDATION)
+
+
+    @staticmethod
+    def _registre(blocs=()):
+        # Import à la demande : NumPy n'est nécessaire qu'avec colonnes=True
+        from objects.registre import RegistreColonnes
+        return RegistreColonnes.depuis_blocs(blocs)
+
+
+    @classmethod
+    def resume(cls, path, mode_minage="threads", nb_processus=None, backend="hashlib", colonnes=False):
+        """
+        Reprend une simulation sauvegardée dans le dossier `path` : l'instantané le plus récent
+        restaure les clés, les soldes et le mempool, puis seuls les blocs écrits après lui sont relus
+        (avec colonnes=True, la copie en colonnes est reconstruite en relisant toute la chaîne)
+        """
+        simulation = cls.__new__(cls)
+        simulation._configurer(mode_minage, nb_processus, backend, path)
+        simulation.stockage = StockageBlocs(path)
+
+        # Instantané cohérent avec les blocs effectivement présents sur disque
+        def est_valide(etat):
+            hauteur = etat['hauteur']
+            return hauteur <= len(simulation.stockage) and simulation.stockage.hashs[hauteur - 1] == etat['hash_sommet']
+
+        etat = dernier_instantane(path, est_valide)
+        if etat is None:
+            raise FileNotFoundError(f"Aucun instantané utilisable dans {path}")
+
+        # Les comptes sont recréés avant de relire les blocs et le mempool qui y font référence
+        simulation.utilisateurs = [Utilisateur(nom, cle) for nom, cle in etat['utilisateurs']]
+        simulation.mineurs = [
+            Mineur(nom, backend=backend, cle_privee_hex=cle, hashrate=hashrate) for nom, cle, hashrate in etat['mineurs']
+        ]
+        simulation.blockchain = Blockchain.depuis_stockage(simulation.stockage, etat['hauteur'], etat['soldes'])
+        if colonnes:
+            simulation.blockchain.registre = cls._registre(simulation.blockchain)
+        simulation.arbre = ArbreBlocs(simulation.blockchain, valider=simulation._valider)
+        simulation.bits = etat['bits']
+        simulation.graine = etat.get('graine')
+        simulation.aleatoire = random.Random(simulation.graine)
+
+        simulation.mempool = Mempool(taille_max=1000)
+        for donnees in etat['mempool']:
+            tx, _ = Transaction.deserialiser(bytes.fromhex(donnees))
+            simulation.mempool.ajouter(tx)
+        simulation.mempool.retirer_blocs(simulation.blockchain[etat['hauteur']:])
+
+        logger.info(f"♻️ Reprise au bloc #{len(simulation.blockchain) - 1} "
+              f"({len(simulation.blockchain) - etat['hauteur']} bloc(s) rejoué(s) après l'instantané)")
+        afficher_soldes(simulation)
+        return simulation
+
+
+    def _valider(self, bloc, bloc_precedent):
+        """ Validation d'un bloc avant son entrée dans la chaîne active (preuve de travail simulée en mode évènements) """
+        bits = self.reciblage.prochains_bits(self.blockchain)
+        debut = time.perf_counter()
+        valide = self.mineurs[0].valider_bloc(bloc, bloc_precedent, bits_attendus=bits, verificateur=self.verificateur,
+                                              verifier_preuve=self.mode_minage != "evenements", recompense=self.recompense_bloc,
+                                              verifier_signatures=not self.signatures_simulees)
+        self.latences_validation.observer(time.perf_counter() - debut)
+        return valide
+
+    def servir_metriques(self, port=9100, hote="127.0.0.1"):
+        """ Démarre l'endpoint HTTP /metrics (format Prometheus) sur un thread d'arrière-plan, arrêté en fin de run """
+        self.serveur_metriques = ServeurMetriques(self, port, hote)
+        logger.info(f"📈 Métriques sur http://{hote}:{self.serveur_metriques.port}/metrics")
+        return self.serveur_metriques
+
+    def sauvegarder_instantane(self):
+        """ Écrit atomiquement l'état courant dans le dossier de données (sans effet sans stockage) """
+        if self.stockage is None:
+            return None
+        return ecrire_instantane(self.dossier_donnees, {
+            'hauteur': len(self.blockchain),
+            'hash_sommet': self.blockchain[-1].hash,
+            'bits': self.bits,
+            'graine': self.graine,
+            'soldes': dict(self.blockchain.soldes.soldes),
+            'mempool': [tx.serialiser().hex() for tx in self.mempool],
+            'utilisateurs': [(u.nom, u.cle_privee_hex) for u in self.utilisateurs],
+            'mineurs': [(m.nom, m.cle_privee_hex, m.hashrate) for m in self.mineurs],
+        })
 
     
+    @traceur.trace
     def creer_transaction(self):
-        """Crée une transaction aléatoire entre deux utilisateurs"""
-        expediteur = random.choice(self.utilisateurs)
-        destinataire = random.choice([u for u in self.utilisateurs if u != expediteur])
+        """Crée une transaction aléatoire entre deux utilisateurs (ou lit la suivante de source_transactions)"""
+        tx = next(self.source_transactions, None) if self.source_transactions is not None else None
+        if tx is None:
+            # Source épuisée : retour aux transactions aléatoires
+            self.source_transactions = None
+            tx = self._transaction_aleatoire()
+            if tx is None:
+                return None
+        
+        # Vérifier la signature à l'entrée dans le mempool (le résultat est mis en cache pour la validation du bloc)
+        if not self.signatures_simulees and not verifier_transaction(tx):
+            return None
+        self.mempool.ajouter(tx)
+        self.transactions_creees += 1
+        logger.debug(tx)
+        return tx
+
+
+    def _transaction_aleatoire(self):
+        expediteur = self.aleatoire.choice(self.utilisateurs)
+        destinataire = self.aleatoire.choice([u for u in self.utilisateurs if u != expediteur])
         
-        # Montant aléatoire entre 0.1 et 5 BTC
-        montant = round(random.uniform(0.1, 5.0), 2)
+        # Montant aléatoire entre 0.1 et 5 BTC, frais entre 0.00005 et 0.0005 BTC
+        montant = round(self.aleatoire.uniform(0.1, 5.0), 2)
+        frais = round(self.aleatoire.uniform(0.00005, 0.0005), 6)
         
         # Vérifier que l'expéditeur a assez de fonds
-        if self.mineurs[0].calculer_solde(self.blockchain, expediteur.cle_publique) < montant:
+        if self.mineurs[0].calculer_solde(self.blockchain, expediteur.cle_publique_hex) < montant + frais:
             return None
         
         # Créer et signer la transaction
-        tx = Transaction(expediteur, destinataire, montant, expediteur.cle_publique_hex)
-        tx.signature = expediteur.signe(tx)
-        self.mempool.append(tx)
-        print(tx)
+        tx = Transaction(expediteur, destinataire, montant, expediteur.cle_publique_hex, frais)
+        if not self.signatures_simulees:
+            tx.signature = expediteur.signe(tx)
+        return tx
 
     
     def lancer_minage(self):
         """Lance le minage en parallèle pour tous les mineurs"""
-        print("\n⛏️ Minage en cours ")
-        self.minage_en_cours = True
+        logger.info("\n⛏️ Minage en cours ")
+        self.bits = self.reciblage.prochains_bits(self.blockchain)
+        # Modèle de bloc commun à tous les mineurs : les transactions aux meilleurs frais
+        self.transactions_bloc = self.mempool.select_for_block(self.max_transactions_par_bloc)
+        with self.minage_lock:
+            self.tour_minage += 1
+            self.minage_en_cours = True
+        tour = self.tour_minage
+        self.fin_minage.clear()
         self.minage_threads = []
+
+        if self.moteur_minage is not None:
+            thread = threading.Thread(target=self.minage_processus, args=(tour,))
+            thread.daemon = True
+            thread.start()
+            self.minage_threads.append(thread)
+            return
         
         for i, mineur in enumerate(self.mineurs):
             thread = threading.Thread(
                 target=self.minage_bloc,
-                args=(i, mineur)
+                args=(i, mineur, tour)
             )
             thread.daemon = True
             thread.start()
             self.minage_threads.append(thread)
 
     
-    def minage_bloc(self, id, mineur):
+    def _tour_actif(self, tour):
+        """ Le tour `tour` est le tour en cours et aucun bloc gagnant n'y a encore été trouvé """
+        return self.tour_minage == tour and self.minage_en_cours
+
+    def minage_bloc(self, id, mineur, tour):
         def check_active():
             """Fonction pour l'arrêt anticipé"""
-            return self.minage_en_cours
+            return self._tour_actif(tour)
 
         # Appel à la méthode du mineur
         bloc = mineur.miner_bloc(
-            transactions_en_attente=self.mempool,
+            transactions_en_attente=self.transactions_bloc,
             hash_dernier_bloc=self.blockchain[-1].hash,
             index_bloc=len(self.blockchain),
             recompense=self.recompense_bloc,
-            difficulte=self.difficulte,
+            bits=self.bits,
             is_mining_active=check_active
         )
         
         # Si un bloc a été miné
         if bloc:
             with self.minage_lock:
-                if self.minage_en_cours:
+                if self._tour_actif(tour):
                     self.minage_en_cours = False
                     self.bloc_gagnant = bloc
+                    self.fin_minage.set()
+
+
+    def minage_processus(self, tour):
+        """Fait concourir les blocs candidats de tous les mineurs sur le pool de processus"""
+        statistiques = [mineur.statistiques for mineur in self.mineurs]
+        for stats in statistiques:
+            stats.demarrer_bloc()
+
+        # Espace des nonces épuisé sans solution : nouveaux candidats (timestamp rafraîchi) tant que le minage est actif
+        resultat = None
+        while resultat is None and self._tour_actif(tour):
+            candidats = [
+                mineur.construire_bloc(
+                    transactions_en_attente=self.transactions_bloc,
+                    hash_dernier_bloc=self.blockchain[-1].hash,
+                    index_bloc=len(self.blockchain),
+                    recompense=self.recompense_bloc,
+                    bits=self.bits
+                ) for mineur in self.mineurs
+            ]
+            entetes = [bloc.entete_prefixe() for bloc in candidats]
+            resultat = self.moteur_minage.miner(entetes, cible_octets(self.bits), lambda: self._tour_actif(tour), statistiques)
+
+        with self.minage_lock:
+            # Thread d'un tour précédent : le tour en cours ne le concerne plus
+            if self.tour_minage != tour:
+                return
+            if resultat is not None and self.minage_en_cours:
+                indice, nonce, hash = resultat
+                bloc = candidats[indice]
+                bloc.nonce = nonce
+                bloc.hash = hash
+                statistiques[indice].solution_trouvee()
+                logger.info(f"\n✅ Bloc miné par {self.mineurs[indice].nom}! Nonce trouvé: {nonce}")
+                self.bloc_gagnant = bloc
+            self.minage_en_cours = False
+            self.fin_minage.set()
+
+
+
+    def statistiques_minage(self):
+        """Compteurs de minage de chaque mineur (lecture sans verrou, utilisable pendant le minage)"""
+        return [mineur.statistiques.instantane() for mineur in self.mineurs]
 
                 
     
     def run(self, cycles):
+        """ Mine `cycles` blocs, retourne le résumé des débits (transactions, blocs et hashs par seconde) """
+        if self.mode_minage == "evenements":
+            return self.run_evenements(cycles)
+
+        debut = time.perf_counter()
+        hauteur_debut = len(self.blockchain)
+        hashs_debut = sum(mineur.statistiques.tentatives for mineur in self.mineurs)
         for i in range(cycles):
             if len(self.mempool) == 0:
-                print(f"\n{'='*60}\n Bloc {i+1}\n{'='*60}\n")
+                logger.info(f"\n{'='*60}\n Bloc {i+1}\n{'='*60}\n")
 
             while len(self.mempool) < self.max_transactions_par_bloc:
                 self.creer_transaction()
-                time.sleep(0.5)
+                if self.pause_transactions:
+                    time.sleep(self.pause_transactions)
             
             self.lancer_minage()
+            self.fin_minage.wait()
+            if self.bloc_gagnant is None:
+                logger.warning("⚠️ Minage arrêté sans bloc gagnant, cycle ignoré")
+                continue
             
-            while self.minage_en_cours:
-                time.sleep(0.1)
-            
-            self.mineurs[0].valider_bloc(self.bloc_gagnant, self.blockchain[-1])
-            self.blockchain.append(self.bloc_gagnant)
-            print(f"✅ Bloc ajouté à la blockchain: {self.bloc_gagnant}\n")
+            _, ajoutes = self.arbre.ajouter(self.bloc_gagnant)
+            if ajoutes:
+                logger.info(f"✅ Bloc ajouté à la blockchain: {self.bloc_gagnant}\n")
+            for bloc in ajoutes:
+                self.mempool.retirer_bloc(bloc)
             self.bloc_gagnant = None
-            self.mempool = []
+            if len(self.blockchain) % self.intervalle_instantanes == 0:
+                self.sauvegarder_instantane()
             cycles += 1
 
+        resume = self._resume_debit(
+            time.perf_counter() - debut,
+            hauteur_debut,
+            sum(mineur.statistiques.tentatives for mineur in self.mineurs) - hashs_debut
+        )
+        self._terminer()
+        return resume
+
+
+    def _resume_debit(self, duree, hauteur_debut, hashs):
+        blocs = len(self.blockchain) - hauteur_debut
+        transactions = sum(
+            sum(1 for tx in bloc.transactions if not tx.est_systeme) for bloc in self.blockchain[hauteur_debut:]
+        )
+        return {
+            'duree': duree,
+            'blocs': blocs,
+            'transactions': transactions,
+            'hashs': hashs,
+            'tx_par_seconde': transactions / duree if duree > 0 else 0.0,
+            'blocs_par_seconde': blocs / duree if duree > 0 else 0.0,
+            'hashs_par_seconde': hashs / duree if duree > 0 else 0.0,
+        }
+
+
+    def run_evenements(self, cycles):
+        """
+        Simulation à événements discrets : `cycles` blocs sans calcul de hash ni attente
+        - l'arrivée des transactions est un processus de Poisson de taux `debit_transactions`
+        - le délai avant le prochain bloc suit la loi exponentielle de taux Σ hashrate / (2^256 / (cible + 1)),
+          et le mineur gagnant est tiré proportionnellement à son hashrate
+        - les blocs sont construits, validés (sauf la preuve de travail) et ajoutés comme en mode threads
+        - sans source_transactions, les transactions sont signées à l'avance par lots sur un pool de processus
+          (objects.charge) : la boucle ne paie plus que leur vérification (~3 ms par transaction, principal coût restant)
+        - avec signatures_simulees, les transactions ne sont ni signées ni vérifiées (les règles des transactions
+          système restent appliquées) : ~1000 blocs par seconde au lieu d'une vingtaine (200 mineurs, 1 cœur)
+        """
+        generateur = None
+        if self.source_transactions is None and not self.signatures_simulees:
+            generateur = GenerateurCharge.depuis_simulation(self, graine=self.graine, debit=self.debit_transactions,
+                                                            loi_montant=loi_uniforme(), nb_processus=self.nb_processus,
+                                                            taille_lot=64)
+            self.source_transactions = generateur.generer(sys.maxsize)
+        try:
+            return self._boucle_evenements(cycles)
+        finally:
+            if generateur is not None:
+                self.source_transactions = None
+                generateur.fermer()
+
+    def _boucle_evenements(self, cycles):
+        file = FileEvenements(self.graine)
+        debut_simule = self.blockchain[-1].timestamp
+        debut = time.perf_counter()
+        hauteur_debut = len(self.blockchain)
+        hashs = 0.0
+
+        def planifier_bloc():
+            self.bits = self.reciblage.prochains_bits(self.blockchain)
+            taux = sum(taux_decouverte(mineur.hashrate, self.bits) for mineur in self.mineurs)
+            file.planifier(file.delai_exponentiel(taux), "bloc")
+
+        file.planifier(file.delai_exponentiel(self.debit_transactions), "transaction")
+        planifier_bloc()
+        instant_sommet = 0.0
+        blocs = 0
+        while blocs < cycles:
+            type, _ = file.suivant()
+            if type == "transaction":
+                self.creer_transaction()
+                file.planifier(file.delai_exponentiel(self.debit_transactions), "transaction")
+                continue
+
+            # Découverte d'un bloc : même construction et même validation qu'un bloc réellement miné
+            mineur = file.tirer_mineur(self.mineurs)
+            bloc = mineur.construire_bloc(
+                transactions_en_attente=self.mempool.select_for_block(self.max_transactions_par_bloc),
+                hash_dernier_bloc=self.blockchain[-1].hash,
+                index_bloc=len(self.blockchain),
+                recompense=self.recompense_bloc,
+                bits=self.bits
+            )
+            bloc.timestamp = debut_simule + file.maintenant
+            bloc.nonce = file.aleatoire.getrandbits(32)
+            bloc.hash = mineur.calculer_hash(bloc, bloc.nonce)
+            hashs += (file.maintenant - instant_sommet) * sum(m.hashrate for m in self.mineurs)
+            instant_sommet = file.maintenant
+
+            if self.arbre.ajouter(bloc)[1]:
+                self.mempool.retirer_bloc(bloc)
+                mineur.statistiques.blocs_trouves += 1
+                blocs += 1
+                if len(self.blockchain) % self.intervalle_instantanes == 0:
+                    self.sauvegarder_instantane()
+            planifier_bloc()
+
+        resume = self._resume_debit(time.perf_counter() - debut, hauteur_debut, hashs)
+        resume['temps_simule'] = file.maintenant
+        resume['temps_bloc_moyen'] = file.maintenant / blocs if blocs else 0.0
+        logger.info(f"\n⏱️ {blocs} blocs en {resume['temps_simule']:,.0f} s simulées "
+                    f"(un bloc toutes les {resume['temps_bloc_moyen']:.1f} s), "
+                    f"{resume['duree']:.2f} s réelles soit {resume['blocs_par_seconde']:,.0f} blocs/s")
+        self._terminer()
+        return resume
+
+
+    def _terminer(self):
         afficher_soldes(self)
-        sauvegarder_blockchain(self.blockchain)
+        # Sans stockage binaire, export texte de la chaîne en fin de simulation
+        if self.stockage is None:
+            sauvegarder_blockchain(self.blockchain)
+        else:
+            self.sauvegarder_instantane()
         
         # Arrêter tous les threads de minage
         self.minage_en_cours = False
         for thread in self.minage_threads:
             if thread.is_alive():
                 thread.join(timeout=1.0)
+        if self.moteur_minage is not None:
+            self.moteur_minage.fermer()
+        if self.verificateur is not None:
+            self.verificateur.fermer()
+        if self.stockage is not None:
+            self.stockage.fermer()
+        if self.serveur_metriques is not None:
+            self.serveur_metriques.fermer()
         
 
 
-if __name__ == "__main__":
-    nombre_cycles = 2
-    simulation = Simulation()
-    simulation.run(nombre_cycles)
+def afficher_debit(resume):
+    """ Résumé de fin d'exécution, affiché quel que soit le niveau de log """
+    print(f"\n📊 {resume['blocs']} blocs, {resume['transactions']} transactions en {resume['duree']:.2f} s : "
+          f"{resume['tx_par_seconde']:,.1f} tx/s, {resume['blocs_par_seconde']:,.2f} blocs/s, "
+          f"{resume['hashs_par_seconde']:,.0f} hashs/s")
+
 
+def afficher_rapport_reseau(rapport):
+    print(f"\n🌐 {rapport['noeuds']} nœuds, {rapport['blocs_mines']} blocs minés, hauteur {rapport['hauteur']}")
+    print(f"   Orphelins : {rapport['blocs_orphelins']} ({rapport['taux_orphelins']:.1%}), "
+          f"réorganisations : {rapport['reorganisations']}, consensus : {rapport['consensus']:.0%}")
+    for p, delai in rapport['propagation'].items():
+        print(f"   Propagation p{p} : {delai:.3f} s (90 % des nœuds : {rapport['propagation_90_noeuds'][p]:.3f} s)")
+
+
+def analyser_arguments(arguments=None):
+    parser = argparse.ArgumentParser(description="Simulation d'une blockchain Bitcoin simplifiée")
+    parser.add_argument("--cycles", type=int, default=2, help="nombre de blocs à miner")
+    parser.add_argument("--mode", choices=["threads", "processus", "evenements", "reseau"], default="threads",
+                        help="minage par threads, sur un pool de processus, simulation à événements discrets "
+                             "ou réseau de nœuds asyncio")
+    parser.add_argument("--processus", type=int, default=None, help="taille des pools de processus")
+    parser.add_argument("--backend", choices=["hashlib", "numpy"], default="hashlib")
+    parser.add_argument("--hashrates", type=float, nargs="+", default=None,
+                        help="hashrate de chaque mineur (mode evenements)")
+    parser.add_argument("--signatures-simulees", action="store_true",
+                        help="mode evenements : transactions ni signées ni vérifiées, comme la preuve de travail")
+    parser.add_argument("--noeuds", type=int, default=100, help="nombre de nœuds (mode reseau)")
+    parser.add_argument("--duree", type=float, default=3600.0, help="durée simulée en secondes (mode reseau)")
+    parser.add_argument("--graine", type=int, default=None,
+                        help="graine des clés des comptes et du tirage des blocs (exécutions reproductibles)")
+    parser.add_argument("--charge", default=None, metavar="FICHIER",
+                        help="transactions signées (python -m objects.charge) consommées avant les transactions aléatoires")
+    parser.add_argument("--donnees", default=None, help="dossier du stockage binaire des blocs et des instantanés")
+    parser.add_argument("--reprendre", action="store_true", help="reprendre la simulation sauvegardée dans --donnees")
+    parser.add_argument("--sans-interface", action="store_true",
+                        help="exécution sans pause ni affichage détaillé, avec un résumé des débits")
+    parser.add_argument("--metriques", type=int, default=None, metavar="PORT",
+                        help="sert les métriques Prometheus sur http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--trace", default=None,
+                        help=f"fichier de trace Chrome (chrome://tracing) ; équivaut à {traceur.VARIABLE}=<fichier>")
+    parser.add_argument("--format-log", choices=STYLES, default="emoji",
+                        help="présentation des logs : emoji et bannières, texte horodaté ou JSON")
+    parser.add_argument("--log", default=None, choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                        help="niveau de log (DEBUG par défaut, WARNING sans interface)")
+    return parser.parse_args(arguments)
+
+
+def main(arguments=None):
+    args = analyser_arguments(arguments)
+    niveau = args.log or ("WARNING" if args.sans_interface else "DEBUG")
+    configurer_journal(niveau, args.format_log)
+    if args.trace:
+        traceur.activer(args.trace)
+
+    if args.mode == "reseau":
+        rapport = Reseau(args.noeuds, hashrates=args.hashrates, graine=args.graine).executer(args.duree)
+        afficher_rapport_reseau(rapport)
+        return rapport
+
+    if args.reprendre:
+        simulation = Simulation.resume(args.donnees, args.mode, args.processus, args.backend)
+    else:
+        simulation = Simulation(args.mode, args.processus, args.backend, args.donnees, hashrates=args.hashrates,
+                                graine=args.graine)
+    if args.sans_interface:
+        simulation.pause_transactions = 0
+    simulation.signatures_simulees = args.signatures_simulees and args.mode == "evenements"
+    if args.charge:
+        simulation.source_transactions = lire_charge(args.charge)
+    if args.metriques is not None:
+        simulation.servir_metriques(args.metriques)
+
+    resume = simulation.run(args.cycles)
+    if args.sans_interface:
+        afficher_debit(resume)
+    return resume
+
+
+if __name__ == "__main__":
+    main()
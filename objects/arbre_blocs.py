@@ -0,0 +1,145 @@
+from objects.difficulte import travail
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class ArbreBlocs:
+    """
+    Arbre des blocs connus, indexé par hash, au-dessus de la chaîne active (Blockchain)
+    - chaque bloc connu garde (hash précédent, hauteur, travail cumulé) ; seuls les blocs hors de
+      la chaîne active sont gardés en entier (ceux de la chaîne sont lus dans la Blockchain)
+    - la meilleure chaîne est celle du sommet au plus grand travail cumulé (à égalité, le premier reçu)
+    - une réorganisation retire puis ajoute uniquement les blocs divergents : l'index des soldes
+      est mis à jour bloc par bloc, son coût est proportionnel à la profondeur de la réorganisation
+    - un bloc dont le parent est inconnu attend son parent
+    - un bloc invalide est écarté avec tous ses descendants connus, et tout bloc construit dessus est refusé
+    L'arbre démarre au sommet de la chaîne fournie : une réorganisation ne peut pas remonter plus loin
+    """
+
+    def __init__(self, blockchain, valider=None):
+        self.blockchain = blockchain
+        # Validation optionnelle d'un bloc avant de l'ajouter à la chaîne active : valider(bloc, bloc_precedent)
+        self.valider = valider
+        sommet = blockchain[-1]
+        # hash -> (hash précédent, hauteur, travail cumulé depuis le sommet initial)
+        self.entetes = {sommet.hash: (sommet.hash_precedent, sommet.index, 0)}
+        self.hors_chaine = {}
+        self.orphelins = {}
+        self.invalides = set()
+        self.reorganisations = 0
+
+    @property
+    def sommet(self):
+        return self.blockchain[-1].hash
+
+    def travail_cumule(self, hash):
+        return self.entetes[hash][2]
+
+    def ajouter(self, bloc):
+        """
+        Ajoute un bloc reçu ou miné, retourne (blocs retirés, blocs ajoutés) de la chaîne active
+        (deux listes vides si le bloc est déjà connu, orphelin, invalide ou sur une branche moins travaillée)
+        """
+        if bloc.hash in self.entetes or bloc.hash in self.invalides:
+            return [], []
+        if bloc.hash_precedent in self.invalides:
+            self._invalider(bloc.hash)
+            return [], []
+        parent = self.entetes.get(bloc.hash_precedent)
+        if parent is None:
+            self.orphelins.setdefault(bloc.hash_precedent, []).append(bloc)
+            return [], []
+
+        self.entetes[bloc.hash] = (bloc.hash_precedent, parent[1] + 1, parent[2] + travail(bloc.bits))
+        if bloc.hash_precedent == self.sommet:
+            if self._etendre(bloc):
+                retires, ajoutes = [], [bloc]
+            else:
+                retires, ajoutes = [], []
+        else:
+            self.hors_chaine[bloc.hash] = bloc
+            if self.travail_cumule(bloc.hash) > self.travail_cumule(self.sommet):
+                retires, ajoutes = self._reorganiser(bloc)
+            else:
+                retires, ajoutes = [], []
+
+        # Les blocs qui attendaient celui-ci peuvent maintenant être rattachés
+        for enfant in self.orphelins.pop(bloc.hash, []):
+            retires_enfant, ajoutes_enfant = self.ajouter(enfant)
+            retires, ajoutes = self._combiner(retires, ajoutes, retires_enfant, ajoutes_enfant)
+        return retires, ajoutes
+
+    def _etendre(self, bloc):
+        if self.valider is not None and not self.valider(bloc, self.blockchain[-1]):
+            self._invalider(bloc.hash)
+            return False
+        self.hors_chaine.pop(bloc.hash, None)
+        self.blockchain.append(bloc)
+        return True
+
+    def _invalider(self, hash):
+        """ Écarte un bloc invalide et ses descendants (branche hors chaîne et orphelins qui l'attendent) """
+        enfants = {}
+        for bloc in self.hors_chaine.values():
+            enfants.setdefault(bloc.hash_precedent, []).append(bloc.hash)
+        a_ecarter = [hash]
+        while a_ecarter:
+            hash = a_ecarter.pop()
+            self.invalides.add(hash)
+            self.entetes.pop(hash, None)
+            self.hors_chaine.pop(hash, None)
+            a_ecarter.extend(enfants.get(hash, []))
+            a_ecarter.extend(orphelin.hash for orphelin in self.orphelins.pop(hash, []))
+
+    def _dans_la_chaine(self, hash):
+        hauteur = self.entetes[hash][1]
+        return hauteur < len(self.blockchain) and self.blockchain[hauteur].hash == hash
+
+    def _reorganiser(self, bloc):
+        """ Bascule sur la branche de `bloc` à partir du dernier ancêtre commun """
+        branche = [bloc]
+        ancetre = bloc.hash_precedent
+        while not self._dans_la_chaine(ancetre):
+            branche.append(self.hors_chaine[ancetre])
+            ancetre = self.entetes[ancetre][0]
+        hauteur_ancetre = self.entetes[ancetre][1]
+
+        retires = []
+        while len(self.blockchain) - 1 > hauteur_ancetre:
+            retire = self.blockchain.pop()
+            self.hors_chaine[retire.hash] = retire
+            retires.append(retire)
+
+        ajoutes = []
+        for bloc_branche in reversed(branche):
+            if not self._etendre(bloc_branche):
+                # Branche invalide : retour à l'ancienne chaîne
+                for ajoute in reversed(ajoutes):
+                    self.hors_chaine[ajoute.hash] = self.blockchain.pop()
+                for retire in reversed(retires):
+                    self.hors_chaine.pop(retire.hash)
+                    self.blockchain.append(retire)
+                return [], []
+            ajoutes.append(bloc_branche)
+
+        self.reorganisations += 1
+        logger.debug("🔀 Réorganisation : %s bloc(s) retiré(s), %s ajouté(s)", len(retires), len(ajoutes))
+        return retires, ajoutes
+
+    @staticmethod
+    def _combiner(retires, ajoutes, retires_suivants, ajoutes_suivants):
+        """ Enchaîne deux changements successifs de la chaîne active """
+        for retire in retires_suivants:
+            if ajoutes and ajoutes[-1] is retire:
+                ajoutes.pop()
+            else:
+                retires.append(retire)
+        return retires, ajoutes + ajoutes_suivants
+
+    def __contains__(self, hash):
+        return hash in self.entetes
+
+    def __len__(self):
+        return len(self.entetes)
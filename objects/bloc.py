@@ -1,21 +1,134 @@
-from objects.transaction import Transaction
-import hashlib
+from objects.transaction import Transaction, TAILLE_TRANSACTION
+from objects.difficulte import bits_depuis_zeros, bits_vers_cible, difficulte_relative
+from objects.merkle import ArbreMerkle
+import struct
 import time
 from typing import List
 
 
+# Header binaire à taille fixe : version | hash précédent | racine Merkle | timestamp | bits
+# (le nonce, seule partie variable, est ajouté à la fin sur 4 octets)
+VERSION = 1
+FORMAT_PREFIXE = struct.Struct("<I32s32sII")
+
+# Sérialisation binaire : index | hash précédent | hash | timestamp | bits | nonce | nombre de transactions
+# suivie des transactions, chacune au format fixe de TAILLE_TRANSACTION octets
+FORMAT_BLOC = struct.Struct("<Q32s32sdIII")
+
+
 class Bloc:
-    def __init__(self, index, transactions, hash_precedent, difficulte=4):
+    """
+    Bloc compact : les hashs sont gardés en octets (propriétés hexadécimales à la demande)
+    et l'arbre de Merkle n'est construit que pour un bloc en cours de construction ou une preuve d'inclusion
+    """
+
+    __slots__ = ('index', 'transactions', 'timestamp', 'bits', 'nonce', '_hash_precedent', '_hash', '_racine', '_arbre')
+
+    def __init__(self, index, transactions, hash_precedent, difficulte=4, bits=None):
         self.index = index
         self.transactions: List[Transaction] = transactions
         self.hash_precedent = hash_precedent
         self.timestamp = time.time()
-        self.difficulte = difficulte
-        self.hash = None
-        # Calcul simplifié de la racine de Merkle
-        merkle_content = ''.join(tx.hash_transaction for tx in self.transactions)
-        self.racine_merkle = hashlib.sha256(merkle_content.encode()).hexdigest()
+        # Cible encodée au format compact ; `difficulte` (nombre de zéros hexadécimaux) sert de valeur par défaut
+        self.bits = bits if bits is not None else bits_depuis_zeros(difficulte)
+        self.nonce = None
+        self._hash = None
+        # Arbre de Merkle sur les hashs des transactions
+        self._arbre = ArbreMerkle(tx.hash_octets for tx in self.transactions)
+        self._racine = self._arbre.racine()
+
+    @property
+    def hash(self):
+        return self._hash.hex() if self._hash is not None else None
+
+    @hash.setter
+    def hash(self, hash_hex):
+        self._hash = bytes.fromhex(hash_hex) if hash_hex is not None else None
+
+    @property
+    def hash_precedent(self):
+        return self._hash_precedent.hex()
+
+    @hash_precedent.setter
+    def hash_precedent(self, hash_hex):
+        self._hash_precedent = bytes.fromhex(hash_hex)
+
+    @property
+    def racine_merkle(self):
+        return self._racine.hex()
+
+    @property
+    def arbre_merkle(self):
+        if self._arbre is None:
+            self._arbre = ArbreMerkle(tx.hash_octets for tx in self.transactions)
+        return self._arbre
+
+    def ajouter_transaction(self, transaction):
+        """ Ajoute une transaction au bloc en cours de construction (racine de Merkle mise à jour en O(log n)) """
+        self.transactions.append(transaction)
+        self.arbre_merkle.ajouter(transaction.hash_octets)
+        self._racine = self._arbre.racine()
+
+    def preuve_inclusion(self, index):
+        """ Preuve que la transaction `index` appartient au bloc, vérifiable avec la seule racine de Merkle """
+        return self.arbre_merkle.preuve(index)
+
+    def alleger(self):
+        """ Libère l'arbre de Merkle d'un bloc terminé (il sera reconstruit si une preuve est demandée) """
+        self._arbre = None
+
+    def entete_prefixe(self):
+        """ Partie invariante du header binaire (76 octets, tout sauf le nonce) """
+        return FORMAT_PREFIXE.pack(
+            VERSION,
+            self._hash_precedent,
+            self._racine,
+            int(self.timestamp),
+            self.bits
+        )
+
+    def serialiser(self):
+        """ Représentation binaire compacte du bloc miné et de ses transactions """
+        entete = FORMAT_BLOC.pack(
+            self.index,
+            self._hash_precedent,
+            self._hash,
+            self.timestamp,
+            self.bits,
+            self.nonce,
+            len(self.transactions)
+        )
+        return entete + b''.join(tx.serialiser() for tx in self.transactions)
+
+    @classmethod
+    def deserialiser(cls, donnees):
+        """ Reconstruit un bloc (la racine de Merkle est recalculée à partir des transactions) """
+        index, hash_precedent, hash, timestamp, bits, nonce, nb_transactions = FORMAT_BLOC.unpack_from(donnees)
+        transactions = [
+            Transaction.deserialiser(donnees, FORMAT_BLOC.size + i * TAILLE_TRANSACTION)[0]
+            for i in range(nb_transactions)
+        ]
+
+        bloc = cls.__new__(cls)
+        bloc.index = index
+        bloc.transactions = transactions
+        bloc._hash_precedent = hash_precedent
+        bloc._hash = hash
+        bloc.timestamp = timestamp
+        bloc.bits = bits
+        bloc.nonce = nonce
+        bloc._arbre = None
+        bloc._racine = ArbreMerkle(tx.hash_octets for tx in transactions).racine()
+        return bloc
+
+    @property
+    def cible(self):
+        """ Cible entière sur 256 bits que le hash du bloc ne doit pas dépasser """
+        return bits_vers_cible(self.bits)
+
+    @property
+    def difficulte(self):
+        return difficulte_relative(self.bits)
             
     def __str__(self):
         return f"Bloc #{self.index} | Hash: {self.hash[:20]}... | Transactions: {len(self.transactions)}"
-
@@ -0,0 +1,126 @@
+from objects.bloc import Bloc
+from objects.transaction import en_btc
+from collections import defaultdict
+from typing import List
+import binascii
+
+
+def identifiant_cle(cle_publique):
+    """ Clé publique (VerifyingKey ou hexadécimal) -> identifiant hexadécimal utilisé par l'index """
+    if isinstance(cle_publique, str):
+        return cle_publique
+    return binascii.hexlify(cle_publique.to_string("compressed")).decode('ascii')
+
+
+class IndexSoldes:
+    """
+    Soldes de tous les comptes en satoshis entiers, indexés par clé publique hexadécimale
+    Mis à jour une seule fois par bloc ajouté (ou retiré), la lecture d'un solde est en O(1)
+    """
+
+    def __init__(self):
+        self.soldes = defaultdict(int)
+
+    def appliquer_bloc(self, bloc, signe=1):
+        for tx in bloc.transactions:
+            montant = tx.montant_satoshis
+            self.soldes[tx.cle_destinataire.hex()] += signe * montant
+            self.soldes[tx.cle_expediteur.hex()] -= signe * (montant + tx.frais_satoshis)
+
+    def annuler_bloc(self, bloc):
+        self.appliquer_bloc(bloc, signe=-1)
+
+    def solde_satoshis(self, cle_publique):
+        return self.soldes.get(identifiant_cle(cle_publique), 0)
+
+    def solde(self, cle_publique):
+        """ Solde en BTC """
+        return en_btc(self.solde_satoshis(cle_publique))
+
+    @classmethod
+    def depuis_blocs(cls, blocs):
+        index = cls()
+        for bloc in blocs:
+            index.appliquer_bloc(bloc)
+        return index
+
+
+class Blockchain:
+    """
+    Chaîne de blocs (s'utilise comme une liste) tenant à jour l'index des soldes :
+    chaque bloc ajouté est appliqué à l'index, chaque bloc retiré y est annulé
+    Avec un stockage, chaque bloc ajouté est aussi écrit sur disque immédiatement,
+    et les blocs antérieurs à une reprise ne sont relus (par mmap) que s'ils sont demandés
+    """
+
+    def __init__(self, blocs=(), stockage=None, registre=None):
+        # Blocs présents en mémoire, à partir du numéro `debut` (les précédents sont dans le stockage)
+        self.blocs: List[Bloc] = []
+        self.debut = 0
+        self.soldes = IndexSoldes()
+        self.stockage = stockage
+        # Copie en colonnes NumPy optionnelle (objects.registre), tenue à jour comme l'index des soldes
+        self.registre = registre
+        for bloc in blocs:
+            self.append(bloc)
+
+    @classmethod
+    def depuis_stockage(cls, stockage, hauteur=0, soldes=None):
+        """
+        Recharge la chaîne écrite dans un stockage (sans la réécrire)
+        À partir d'un instantané (`hauteur` blocs et leurs soldes), seuls les blocs suivants sont relus
+        """
+        chain = cls(stockage=stockage)
+        chain.debut = hauteur
+        if soldes is not None:
+            chain.soldes.soldes.update(soldes)
+        for index in range(hauteur, len(stockage)):
+            chain._empiler(stockage.lire(index))
+        return chain
+
+    def _empiler(self, bloc):
+        # Un bloc de la chaîne n'est plus modifié : son arbre de Merkle n'est gardé qu'à la demande
+        bloc.alleger()
+        self.blocs.append(bloc)
+        self.soldes.appliquer_bloc(bloc)
+        if self.registre is not None:
+            self.registre.ajouter_bloc(bloc)
+
+    def append(self, bloc):
+        self._empiler(bloc)
+        if self.stockage is not None:
+            self.stockage.ajouter(bloc)
+
+    def pop(self):
+        if not self.blocs:
+            self.debut -= 1
+            self.blocs.append(self.stockage.lire(self.debut))
+        bloc = self.blocs.pop()
+        self.soldes.annuler_bloc(bloc)
+        if self.registre is not None:
+            self.registre.retirer_bloc()
+        if self.stockage is not None:
+            self.stockage.tronquer(len(self))
+        return bloc
+
+    def solde(self, cle_publique):
+        return self.soldes.solde(cle_publique)
+
+    def __len__(self):
+        return self.debut + len(self.blocs)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("numéro de bloc hors de la chaîne")
+        if index < self.debut:
+            return self.stockage.lire(index)
+        return self.blocs[index - self.debut]
+
+    def __iter__(self):
+        for index in range(self.debut):
+            yield self.stockage.lire(index)
+        yield from self.blocs
@@ -0,0 +1,215 @@
+from objects.utilisateur import Utilisateur
+from objects.transaction import Transaction, TAILLE_TRANSACTION, en_btc, en_satoshis
+from objects.trousseau import TrousseauCles
+from objects.traceur import trace
+from concurrent.futures import ProcessPoolExecutor
+from ecdsa import SigningKey, SECP256k1
+from collections import deque
+import argparse
+import bisect
+import itertools
+import mmap
+import os
+import random
+import time
+
+
+# Clés privées des comptes, transmises une fois à chaque processus de signature
+_cles = None
+
+
+def _initialiser_processus(cles_privees_hex):
+    global _cles
+    _cles = [SigningKey.from_string(bytes.fromhex(cle), curve=SECP256k1) for cle in cles_privees_hex]
+
+
+@trace
+def _signer_lot(lot):
+    """ Signe un lot de (numéro du compte expéditeur, contenu) ; signatures déterministes (RFC 6979) """
+    return [_cles[compte].sign_deterministic(contenu) for compte, contenu in lot]
+
+
+def loi_lognormale(mu=-1.0, sigma=1.0):
+    """ Montants en BTC suivant une loi log-normale (beaucoup de petits paiements, quelques gros) """
+    return lambda aleatoire: aleatoire.lognormvariate(mu, sigma)
+
+
+def loi_uniforme(minimum=0.1, maximum=5.0):
+    """ Montants en BTC uniformes, comme Simulation.creer_transaction """
+    return lambda aleatoire: aleatoire.uniform(minimum, maximum)
+
+
+class GenerateurCharge:
+    """
+    Générateur reproductible de transactions valides entre N comptes
+    - graine : même graine, mêmes comptes et mêmes transactions (signatures déterministes comprises)
+    - popularité des expéditeurs selon une loi de Zipf d'exposant `exposant_zipf` (le compte de rang k
+      envoie proportionnellement à 1 / k^s), destinataires uniformes
+    - montants tirés par `loi_montant`, bornés par le solde de l'expéditeur : aucune transaction
+      n'est abandonnée, un expéditeur sans fonds laisse simplement la place à un autre
+    - arrivées selon un processus de Poisson de `debit` transactions par seconde, timestamps comptés
+      à partir de `debut` (fixe par défaut pour que le fichier produit ne dépende que de la graine)
+    - signatures ECDSA réparties par lots sur un pool de processus
+    Les soldes sont suivis dans l'ordre de génération : les transactions sont valides si elles
+    sont appliquées dans cet ordre
+    """
+
+    def __init__(self, nb_comptes=None, graine=0, solde_initial=1000.0, exposant_zipf=1.1, loi_montant=None,
+                 debit=100.0, debut=0.0, frais=(0.00005, 0.0005), nb_processus=None, taille_lot=512, comptes=None,
+                 soldes=None, trousseau=None):
+        self.aleatoire = random.Random(graine)
+        # Comptes existants (par exemple ceux d'une Simulation) ou comptes dérivés de la graine
+        if comptes is None:
+            noms = [f"Compte_{i}" for i in range(nb_comptes)]
+            if trousseau is not None:
+                trousseau.preparer(graine, noms, nb_processus)
+            comptes = [Utilisateur(nom, graine=graine, trousseau=trousseau) for nom in noms]
+        self.comptes = list(comptes)
+        self.soldes = [
+            en_satoshis(soldes[compte.cle_publique_hex] if soldes is not None else solde_initial)
+            for compte in self.comptes
+        ]
+        self.loi_montant = loi_montant or loi_lognormale()
+        self.debit = debit
+        self.frais = frais
+        self.instant = debut
+        self.nb_processus = nb_processus or os.cpu_count() or 1
+        self.taille_lot = taille_lot
+        self._poids_cumules = list(itertools.accumulate(1 / rang ** exposant_zipf for rang in range(1, len(self.comptes) + 1)))
+        self._executeur = None
+
+    @classmethod
+    def depuis_simulation(cls, simulation, **options):
+        """ Charge entre les utilisateurs d'une Simulation, à partir de leurs soldes dans la chaîne """
+        soldes = {u.cle_publique_hex: simulation.blockchain.solde(u.cle_publique_hex) for u in simulation.utilisateurs}
+        return cls(comptes=simulation.utilisateurs, soldes=soldes, **options)
+
+    def _tirer_expediteur(self, frais_min):
+        """ Expéditeur selon la loi de Zipf, parmi les comptes capables de payer au moins les frais minimaux """
+        for _ in range(64):
+            rang = bisect.bisect_left(self._poids_cumules, self.aleatoire.random() * self._poids_cumules[-1])
+            rang = min(rang, len(self.comptes) - 1)
+            if self.soldes[rang] > frais_min:
+                return rang
+        # Comptes populaires épuisés : premier compte solvable
+        return next((i for i, solde in enumerate(self.soldes) if solde > frais_min), None)
+
+    def _transaction(self):
+        """ Transaction suivante (non signée) et numéro de son expéditeur, ou None si plus personne ne peut payer """
+        frais = en_satoshis(round(self.aleatoire.uniform(*self.frais), 6))
+        expediteur = self._tirer_expediteur(frais)
+        if expediteur is None:
+            return None
+        destinataire = self.aleatoire.randrange(len(self.comptes) - 1)
+        if destinataire >= expediteur:
+            destinataire += 1
+        montant = min(en_satoshis(self.loi_montant(self.aleatoire)), self.soldes[expediteur] - frais)
+        montant = max(montant, 1)
+        if montant + frais > self.soldes[expediteur]:
+            return None
+        self.soldes[expediteur] -= montant + frais
+        self.soldes[destinataire] += montant
+        self.instant += self.aleatoire.expovariate(self.debit)
+
+        compte = self.comptes[expediteur]
+        tx = Transaction(compte, self.comptes[destinataire], en_btc(montant), compte.cle_publique_hex, en_btc(frais),
+                         timestamp=self.instant)
+        return expediteur, tx
+
+    def _pool(self):
+        if self._executeur is None:
+            self._executeur = ProcessPoolExecutor(
+                max_workers=self.nb_processus,
+                initializer=_initialiser_processus,
+                initargs=([compte.cle_privee_hex for compte in self.comptes],)
+            )
+        return self._executeur
+
+    def generer(self, nb_transactions):
+        """
+        Flux de `nb_transactions` transactions signées, dans l'ordre de génération
+        Les lots sont signés en parallèle, avec au plus deux lots en attente par processus
+        """
+        if self.nb_processus == 1:
+            _initialiser_processus([compte.cle_privee_hex for compte in self.comptes])
+        en_cours = deque()
+        restantes = nb_transactions
+        while restantes > 0 or en_cours:
+            while restantes > 0 and len(en_cours) < 2 * self.nb_processus:
+                taille = min(self.taille_lot, restantes)
+                lot = list(itertools.islice(iter(self._transaction, None), taille))
+                # Lot incomplet : plus aucun compte ne peut payer
+                restantes = restantes - taille if len(lot) == taille else 0
+                if not lot:
+                    break
+                a_signer = [(expediteur, tx.contenu) for expediteur, tx in lot]
+                if self.nb_processus == 1:
+                    en_cours.append((lot, _signer_lot(a_signer)))
+                else:
+                    en_cours.append((lot, self._pool().submit(_signer_lot, a_signer)))
+            if not en_cours:
+                break
+
+            lot, signatures = en_cours.popleft()
+            if not isinstance(signatures, list):
+                signatures = signatures.result()
+            for (_, tx), signature in zip(lot, signatures):
+                tx.signature = signature.hex()
+                yield tx
+
+    def ecrire(self, fichier, nb_transactions):
+        """ Écrit le flux dans un fichier binaire (enregistrements de TAILLE_TRANSACTION octets), retourne le nombre écrit """
+        nombre = 0
+        with open(fichier, 'wb') as f:
+            for tx in self.generer(nb_transactions):
+                f.write(tx.serialiser())
+                nombre += 1
+        return nombre
+
+    def fermer(self):
+        if self._executeur is not None:
+            self._executeur.shutdown(wait=True)
+            self._executeur = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+
+def lire_charge(fichier):
+    """ Relit un fichier écrit par GenerateurCharge.ecrire, transaction par transaction (via mmap) """
+    with open(fichier, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as donnees:
+            for position in range(0, len(donnees) - TAILLE_TRANSACTION + 1, TAILLE_TRANSACTION):
+                yield Transaction.deserialiser(donnees, position)[0]
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Génère un fichier de transactions signées reproductible")
+    parser.add_argument("sortie", help="fichier binaire de sortie")
+    parser.add_argument("--transactions", type=int, default=100_000)
+    parser.add_argument("--comptes", type=int, default=1000)
+    parser.add_argument("--graine", type=int, default=0)
+    parser.add_argument("--zipf", type=float, default=1.1, help="exposant de la loi de Zipf des expéditeurs")
+    parser.add_argument("--debit", type=float, default=100.0, help="transactions par seconde (timestamps)")
+    parser.add_argument("--processus", type=int, default=None)
+    parser.add_argument("--cles", default=None, help="trousseau des clés dérivées (fichier JSON réutilisé d'une exécution à l'autre)")
+    args = parser.parse_args(arguments)
+
+    debut = time.perf_counter()
+    trousseau = TrousseauCles(args.cles) if args.cles else None
+    with GenerateurCharge(args.comptes, args.graine, exposant_zipf=args.zipf, debit=args.debit,
+                          nb_processus=args.processus, trousseau=trousseau) as generateur:
+        nombre = generateur.ecrire(args.sortie, args.transactions)
+    if trousseau is not None:
+        trousseau.fermer()
+    duree = time.perf_counter() - debut
+    print(f"💾 {nombre:,} transactions écrites dans {args.sortie} en {duree:.1f} s ({nombre / duree:,.0f} tx/s)")
+
+
+if __name__ == "__main__":
+    main()
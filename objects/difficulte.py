@@ -0,0 +1,87 @@
+"""Cible de minage sur 256 bits, encodage compact "bits" (comme Bitcoin) et ajustement de la difficulté"""
+
+
+# Cible la plus facile autorisée (bits = 0x207fffff, comme le regtest de Bitcoin)
+BITS_MAX = 0x207fffff
+
+
+def bits_vers_cible(bits):
+    """ Décode le format compact : 1 octet d'exposant + 3 octets de mantisse """
+    exposant = bits >> 24
+    mantisse = bits & 0x007fffff
+    if exposant <= 3:
+        return mantisse >> (8 * (3 - exposant))
+    return mantisse << (8 * (exposant - 3))
+
+
+def cible_vers_bits(cible):
+    """ Encode une cible entière au format compact (la précision est réduite à 3 octets de mantisse) """
+    taille = (cible.bit_length() + 7) // 8
+    if taille <= 3:
+        mantisse = cible << (8 * (3 - taille))
+    else:
+        mantisse = cible >> (8 * (taille - 3))
+    # Le bit de poids fort de la mantisse est un bit de signe : on décale d'un octet
+    if mantisse & 0x00800000:
+        mantisse >>= 8
+        taille += 1
+    return (taille << 24) | mantisse
+
+
+CIBLE_MAX = bits_vers_cible(BITS_MAX)
+
+
+def cible_depuis_zeros(zeros):
+    """ Cible équivalente à un hash commençant par `zeros` zéros hexadécimaux """
+    return min((1 << (256 - 4 * zeros)) - 1, CIBLE_MAX)
+
+
+def bits_depuis_zeros(zeros):
+    return cible_vers_bits(cible_depuis_zeros(zeros))
+
+
+def cible_octets(bits):
+    """ Cible sur 32 octets big-endian, directement comparable au hash brut """
+    return bits_vers_cible(bits).to_bytes(32, 'big')
+
+
+def travail(bits):
+    """ Nombre moyen de hashs nécessaires pour trouver un bloc à cette cible (travail apporté par le bloc) """
+    return 2 ** 256 // (bits_vers_cible(bits) + 1)
+
+
+def difficulte_relative(bits):
+    """ Difficulté au sens de Bitcoin : nombre de fois où la cible est plus dure que la cible maximale """
+    return CIBLE_MAX / bits_vers_cible(bits)
+
+
+class Reciblage:
+    """
+    Ajuste la cible tous les `intervalle` blocs pour maintenir un temps de bloc moyen :
+    nouvelle cible = ancienne cible × temps mesuré / temps attendu
+    (le facteur est borné comme dans Bitcoin pour éviter les variations brutales)
+    """
+
+    def __init__(self, bits_initiaux, temps_bloc_cible, intervalle=10, facteur_max=4.0):
+        self.bits_initiaux = bits_initiaux
+        self.temps_bloc_cible = temps_bloc_cible
+        self.intervalle = intervalle
+        self.facteur_max = facteur_max
+
+    def prochains_bits(self, chain):
+        """ Bits que doit porter le prochain bloc ajouté à `chain` """
+        # Le bloc genesis n'est pas soumis à l'ajustement
+        if len(chain) == 1:
+            return self.bits_initiaux
+
+        dernier = chain[-1]
+        if len(chain) <= self.intervalle or len(chain) % self.intervalle != 0:
+            return dernier.bits
+
+        # Durée des `intervalle` derniers intervalles entre blocs
+        temps_mesure = dernier.timestamp - chain[-1 - self.intervalle].timestamp
+        temps_attendu = self.intervalle * self.temps_bloc_cible
+        facteur = min(max(temps_mesure / temps_attendu, 1 / self.facteur_max), self.facteur_max)
+
+        nouvelle_cible = int(bits_vers_cible(dernier.bits) * facteur)
+        return cible_vers_bits(min(max(nouvelle_cible, 1), CIBLE_MAX))
@@ -0,0 +1,51 @@
+from objects.difficulte import bits_vers_cible
+import heapq
+import itertools
+import random
+
+
+def hashs_par_bloc(bits):
+    """ Nombre moyen de hashs pour trouver un bloc à la cible `bits` : 2^256 / (cible + 1) """
+    return 2 ** 256 / (bits_vers_cible(bits) + 1)
+
+
+def taux_decouverte(hashrate, bits):
+    """ Blocs trouvés par seconde (en moyenne) avec `hashrate` hashs par seconde """
+    return hashrate / hashs_par_bloc(bits)
+
+
+class FileEvenements:
+    """
+    File d'événements datés en temps simulé (heapq), sans aucune attente réelle
+    - `planifier` ajoute un événement `delai` secondes après l'instant courant
+    - `suivant` avance l'horloge jusqu'au prochain événement et le retourne
+    Les événements de même date sont traités dans leur ordre de planification
+    """
+
+    def __init__(self, graine=None):
+        self.maintenant = 0.0
+        self.aleatoire = random.Random(graine)
+        self._tas = []
+        self._compteur = itertools.count()
+
+    def planifier(self, delai, type, *donnees):
+        heapq.heappush(self._tas, (self.maintenant + delai, next(self._compteur), type, donnees))
+
+    def suivant(self):
+        instant, _, type, donnees = heapq.heappop(self._tas)
+        self.maintenant = instant
+        return type, donnees
+
+    def delai_exponentiel(self, taux):
+        """ Délai avant le prochain événement d'un processus de Poisson de `taux` événements par seconde """
+        return self.aleatoire.expovariate(taux) if taux > 0 else float('inf')
+
+    def tirer_mineur(self, mineurs):
+        """
+        Auteur d'une découverte : le minimum de durées exponentielles indépendantes est exponentiel
+        de taux la somme des taux, et chaque mineur l'emporte proportionnellement à son hashrate
+        """
+        return self.aleatoire.choices(mineurs, weights=[mineur.hashrate for mineur in mineurs])[0]
+
+    def __len__(self):
+        return len(self._tas)
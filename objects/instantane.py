@@ -0,0 +1,49 @@
+import glob
+import json
+import os
+
+
+PREFIXE = "instantane_"
+
+
+def chemin_instantane(dossier, hauteur):
+    return os.path.join(dossier, f"{PREFIXE}{hauteur:010d}.json")
+
+
+def ecrire_instantane(dossier, etat, nb_conserves=2):
+    """
+    Écrit atomiquement l'instantané `etat` (dictionnaire JSON contenant sa `hauteur`) :
+    fichier temporaire synchronisé sur disque puis renommé, un arrêt brutal laisse donc
+    soit l'ancien instantané, soit le nouveau complet
+    Seuls les `nb_conserves` instantanés les plus récents sont gardés
+    """
+    chemin = chemin_instantane(dossier, etat['hauteur'])
+    temporaire = chemin + ".tmp"
+    with open(temporaire, 'w', encoding='utf-8') as f:
+        json.dump(etat, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporaire, chemin)
+
+    for ancien in lister_instantanes(dossier)[:-nb_conserves]:
+        os.remove(ancien)
+    return chemin
+
+
+def lister_instantanes(dossier):
+    """ Instantanés complets du dossier, du plus ancien au plus récent """
+    return sorted(glob.glob(os.path.join(dossier, f"{PREFIXE}*.json")))
+
+
+def lire_instantane(chemin):
+    with open(chemin, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def dernier_instantane(dossier, est_valide=lambda etat: True):
+    """ Instantané le plus récent accepté par `est_valide`, ou None s'il n'y en a aucun """
+    for chemin in reversed(lister_instantanes(dossier)):
+        etat = lire_instantane(chemin)
+        if est_valide(etat):
+            return etat
+    return None
@@ -0,0 +1,105 @@
+"""
+Journalisation asynchrone : les threads de la simulation déposent leurs messages dans une file
+(QueueHandler) et un thread d'arrière-plan (QueueListener) les écrit sur le terminal
+- un thread de minage ou de simulation ne bloque jamais sur l'écriture dans le terminal
+- le niveau est filtré avant toute mise en forme (les messages désactivés ne coûtent qu'un test)
+- la présentation est un choix de formateur : "emoji" (affichage d'origine, bannières comprises),
+  "texte" (horodatage, niveau et module, sans emoji ni bannières) ou "json" (une ligne JSON par message)
+La file n'est pas partagée entre processus : les processus de travail des pools ne journalisent pas
+"""
+
+from logging.handlers import QueueHandler, QueueListener
+import atexit
+import json
+import logging
+import queue
+import re
+import sys
+
+
+STYLES = ("emoji", "texte", "json")
+
+# Emoji, pictogrammes et sélecteurs de variante, retirés des formats "texte" et "json"
+_EMOJI = re.compile("[\U0001F000-\U0001FAFF\u2600-\u27BF\u2B00-\u2BFF\uFE0F\u200D]")
+# Lignes de bannière ("=====", "-----")
+_BANNIERE = re.compile(r"^\s*([=\-])\1{3,}\s*$")
+
+_ecouteur = None
+
+
+def nettoyer(message):
+    """ Message sans emoji ni lignes de bannière, sur une seule ligne si possible """
+    lignes = [_EMOJI.sub("", ligne).strip() for ligne in message.splitlines()]
+    return " | ".join(ligne for ligne in lignes if ligne and not _BANNIERE.match(ligne))
+
+
+class FormateurTexte(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+
+    def formatMessage(self, record):
+        record.message = nettoyer(record.message)
+        return super().formatMessage(record)
+
+
+class FormateurJson(logging.Formatter):
+    def format(self, record):
+        return json.dumps({
+            'instant': record.created,
+            'niveau': record.levelname,
+            'module': record.name,
+            'thread': record.threadName,
+            'message': nettoyer(record.getMessage()),
+        }, ensure_ascii=False)
+
+
+class FiltreVides(logging.Filter):
+    """ Écarte les messages vides une fois nettoyés (bannières seules, lignes blanches) """
+
+    def filter(self, record):
+        return bool(nettoyer(record.getMessage()))
+
+
+def formateur(style):
+    if style == "emoji":
+        return logging.Formatter("%(message)s")
+    if style == "texte":
+        return FormateurTexte()
+    if style == "json":
+        return FormateurJson()
+    raise ValueError(f"Style de journal inconnu : {style}")
+
+
+def configurer_journal(niveau="INFO", style="emoji", flux=None):
+    """
+    Remplace les handlers du logger racine par une file vidée par un thread d'arrière-plan
+    écrivant sur `flux` (sys.stdout par défaut, comme les print d'origine) ; les messages restants sont écrits à la sortie du programme
+    """
+    global _ecouteur
+    arreter_journal()
+    sortie = logging.StreamHandler(flux or sys.stdout)
+    sortie.setFormatter(formateur(style))
+    if style != "emoji":
+        sortie.addFilter(FiltreVides())
+
+    file = queue.SimpleQueue()
+    racine = logging.getLogger()
+    for handler in list(racine.handlers):
+        racine.removeHandler(handler)
+    racine.addHandler(QueueHandler(file))
+    racine.setLevel(niveau)
+
+    _ecouteur = QueueListener(file, sortie, respect_handler_level=True)
+    _ecouteur.start()
+    return _ecouteur
+
+
+def arreter_journal():
+    """ Écrit les messages encore en file et arrête le thread d'écriture """
+    global _ecouteur
+    if _ecouteur is not None:
+        _ecouteur.stop()
+        _ecouteur = None
+
+
+atexit.register(arreter_journal)
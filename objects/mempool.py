@@ -0,0 +1,113 @@
+from objects.transaction import Transaction
+from typing import List
+import heapq
+import itertools
+
+
+class Mempool:
+    """
+    Transactions en attente, ordonnées par taux de frais (frais / taille en octets)
+    - insertion et retrait en O(log n) grâce à deux tas (priorité maximale pour les blocs,
+      priorité minimale pour l'éviction) avec suppression paresseuse
+    - dédoublonnage en O(1) par hash_transaction
+    - plafond en nombre de transactions et/ou en octets : la transaction au plus faible taux est évincée
+    """
+
+    def __init__(self, taille_max=None, octets_max=None):
+        self.taille_max = taille_max
+        self.octets_max = octets_max
+        self.octets = 0
+        # hash_transaction -> (transaction, numéro d'insertion)
+        self._entrees = {}
+        self._tas_max = []
+        self._tas_min = []
+        self._compteur = itertools.count()
+
+    def ajouter(self, tx: Transaction):
+        """Ajoute une transaction, retourne False si elle est déjà présente ou refusée faute de place"""
+        if tx.hash_transaction in self._entrees:
+            return False
+        taux = tx.taux_frais
+        if self._entrees and self._depasse(1, tx.taille) and taux <= self._plus_faible_taux():
+            return False
+
+        numero = next(self._compteur)
+        self._entrees[tx.hash_transaction] = (tx, numero)
+        self.octets += tx.taille
+        heapq.heappush(self._tas_max, (-taux, numero, tx.hash_transaction))
+        heapq.heappush(self._tas_min, (taux, numero, tx.hash_transaction))
+
+        # Éviction des transactions au plus faible taux de frais
+        while self._depasse(0, 0):
+            _, _, hash_evince = self._sommet(self._tas_min)
+            self.retirer(hash_evince)
+        return tx.hash_transaction in self._entrees
+
+    def retirer(self, hash_transaction):
+        """Retire une transaction (les entrées des tas sont ignorées plus tard), retourne la transaction ou None"""
+        entree = self._entrees.pop(hash_transaction, None)
+        if entree is None:
+            return None
+        tx, _ = entree
+        self.octets -= tx.taille
+        # Reconstruction des tas lorsque les entrées périmées deviennent majoritaires
+        if len(self._tas_max) > 2 * len(self._entrees) + 64:
+            self._compacter()
+        return tx
+
+    def retirer_bloc(self, bloc):
+        """Retire les transactions incluses dans un bloc, les autres restent pour le bloc suivant"""
+        for tx in bloc.transactions:
+            self.retirer(tx.hash_transaction)
+
+    def retirer_blocs(self, blocs):
+        for bloc in blocs:
+            self.retirer_bloc(bloc)
+
+    def select_for_block(self, max_tx) -> List[Transaction]:
+        """Modèle de bloc : les `max_tx` transactions au meilleur taux de frais, par ordre de priorité"""
+        selection = []
+        extraites = []
+        while self._tas_max and len(selection) < max_tx:
+            element = heapq.heappop(self._tas_max)
+            if self._est_valide(element):
+                extraites.append(element)
+                selection.append(self._entrees[element[2]][0])
+        for element in extraites:
+            heapq.heappush(self._tas_max, element)
+        return selection
+
+    def _depasse(self, nombre, octets):
+        """Le plafond serait-il dépassé avec `nombre` transactions et `octets` octets de plus ?"""
+        if self.taille_max is not None and len(self._entrees) + nombre > self.taille_max:
+            return True
+        return self.octets_max is not None and self.octets + octets > self.octets_max
+
+    def _plus_faible_taux(self):
+        taux, _, _ = self._sommet(self._tas_min)
+        return taux
+
+    def _sommet(self, tas):
+        while not self._est_valide(tas[0]):
+            heapq.heappop(tas)
+        return tas[0]
+
+    def _est_valide(self, element):
+        entree = self._entrees.get(element[2])
+        return entree is not None and entree[1] == element[1]
+
+    def _compacter(self):
+        self._tas_max = [e for e in self._tas_max if self._est_valide(e)]
+        self._tas_min = [e for e in self._tas_min if self._est_valide(e)]
+        heapq.heapify(self._tas_max)
+        heapq.heapify(self._tas_min)
+
+    def __len__(self):
+        return len(self._entrees)
+
+    def __contains__(self, hash_transaction):
+        return hash_transaction in self._entrees
+
+    def __iter__(self):
+        """Transactions par ordre d'arrivée"""
+        return (tx for tx, _ in self._entrees.values())
@@ -0,0 +1,63 @@
+import hashlib
+
+
+def double_sha256(donnees):
+    return hashlib.sha256(hashlib.sha256(donnees).digest()).digest()
+
+
+class ArbreMerkle:
+    """
+    Arbre de Merkle binaire sur les hashs bruts (32 octets) des transactions
+    Comme dans Bitcoin, le dernier nœud d'un niveau de taille impaire est associé à lui-même
+    - ajout d'une feuille en O(log n) : seule la branche la plus à droite est recalculée
+    - preuve d'inclusion en O(log n) : un hash frère par niveau
+    """
+
+    def __init__(self, feuilles=()):
+        self.niveaux = [[]]
+        for feuille in feuilles:
+            self.ajouter(feuille)
+
+    def ajouter(self, feuille):
+        self.niveaux[0].append(feuille)
+        position = len(self.niveaux[0]) - 1
+        hauteur = 0
+        while len(self.niveaux[hauteur]) > 1:
+            niveau = self.niveaux[hauteur]
+            parent = position // 2
+            gauche = niveau[2 * parent]
+            droite = niveau[2 * parent + 1] if 2 * parent + 1 < len(niveau) else gauche
+            if hauteur + 1 == len(self.niveaux):
+                self.niveaux.append([])
+            niveau_parent = self.niveaux[hauteur + 1]
+            if parent < len(niveau_parent):
+                niveau_parent[parent] = double_sha256(gauche + droite)
+            else:
+                niveau_parent.append(double_sha256(gauche + droite))
+            position = parent
+            hauteur += 1
+
+    def racine(self):
+        if not self.niveaux[0]:
+            return bytes(32)
+        return self.niveaux[-1][0]
+
+    def preuve(self, index):
+        """ Liste de (hash frère, le frère est-il à droite) de la feuille jusqu'à la racine """
+        preuve = []
+        for niveau in self.niveaux[:-1]:
+            frere = index ^ 1
+            preuve.append((niveau[frere] if frere < len(niveau) else niveau[index], index % 2 == 0))
+            index //= 2
+        return preuve
+
+    @staticmethod
+    def verifier_preuve(feuille, preuve, racine):
+        """ Recalcule la racine à partir de la feuille et de sa preuve """
+        hash = feuille
+        for frere, a_droite in preuve:
+            hash = double_sha256(hash + frere) if a_droite else double_sha256(frere + hash)
+        return hash == racine
+
+    def __len__(self):
+        return len(self.niveaux[0])
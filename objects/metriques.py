@@ -0,0 +1,130 @@
+from objects import verification
+from objects.telemetrie import Histogramme
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+import resource
+import threading
+
+
+# Intervalles entre blocs (secondes, temps des timestamps des blocs)
+BORNES_INTERVALLES = (0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300, 600)
+# Durées de validation d'un bloc (secondes)
+BORNES_VALIDATION = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+
+def memoire_residente():
+    """ Mémoire résidente (RSS) du processus en octets ; à défaut de /proc, le maximum atteint """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _echapper(valeur):
+    return str(valeur).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class CollecteurMetriques:
+    """
+    Métriques d'une Simulation au format texte Prometheus, calculées au moment de la lecture
+    - rien n'est ajouté à la boucle de minage : les compteurs des mineurs (StatistiquesMineur)
+      et la longueur de la chaîne sont lus sans verrou
+    - l'histogramme des intervalles entre blocs est complété, à chaque lecture, avec les blocs ajoutés depuis
+      la précédente (toujours en mémoire : le stockage n'est jamais lu depuis le thread du serveur)
+    """
+
+    def __init__(self, simulation):
+        self.simulation = simulation
+        self.intervalles = Histogramme(BORNES_INTERVALLES)
+        self._hauteur_vue = len(simulation.blockchain)
+        self._dernier_timestamp = simulation.blockchain[-1].timestamp
+        self._verrou = threading.Lock()
+
+    def _completer_intervalles(self):
+        blockchain = self.simulation.blockchain
+        hauteur = len(blockchain)
+        if hauteur <= self._hauteur_vue:
+            return
+        for bloc in blockchain[self._hauteur_vue:hauteur]:
+            self.intervalles.observer(max(bloc.timestamp - self._dernier_timestamp, 0.0))
+            self._dernier_timestamp = bloc.timestamp
+        self._hauteur_vue = hauteur
+
+    def rendu(self):
+        # Lectures concurrentes (serveur multi-thread) : l'histogramme des intervalles n'a qu'un écrivain à la fois
+        with self._verrou:
+            self._completer_intervalles()
+        simulation = self.simulation
+        lignes = []
+
+        def metrique(nom, type, aide, valeurs):
+            lignes.append(f"# HELP {nom} {aide}")
+            lignes.append(f"# TYPE {nom} {type}")
+            for etiquettes, valeur in valeurs:
+                texte = ",".join(f'{cle}="{_echapper(v)}"' for cle, v in etiquettes.items())
+                lignes.append(f"{nom}{{{texte}}} {valeur}" if texte else f"{nom} {valeur}")
+
+        def histogramme(nom, aide, histo):
+            lignes.append(f"# HELP {nom} {aide}")
+            lignes.append(f"# TYPE {nom} histogram")
+            for borne, cumul in histo.cumuls():
+                lignes.append(f'{nom}_bucket{{le="{"+Inf" if borne == float("inf") else borne}"}} {cumul}')
+            lignes.append(f"{nom}_sum {histo.somme}")
+            lignes.append(f"{nom}_count {histo.nombre}")
+
+        statistiques = [mineur.statistiques for mineur in simulation.mineurs]
+        metrique("blockchain_hashs_total", "counter", "Hashs calculés par mineur",
+                 [({'mineur': s.nom}, s.tentatives) for s in statistiques])
+        metrique("blockchain_hashs_par_seconde", "gauge", "Hashs par seconde par mineur (10 dernières secondes)",
+                 [({'mineur': s.nom}, s.hashrate(10.0)) for s in statistiques])
+        metrique("blockchain_blocs_trouves_total", "counter", "Blocs trouvés par mineur",
+                 [({'mineur': s.nom}, s.blocs_trouves) for s in statistiques])
+        metrique("blockchain_hauteur", "gauge", "Hauteur de la chaîne", [({}, len(simulation.blockchain) - 1)])
+        metrique("blockchain_mempool_transactions", "gauge", "Transactions en attente dans le mempool",
+                 [({}, len(simulation.mempool))])
+        histogramme("blockchain_intervalle_blocs_secondes", "Intervalle entre blocs consécutifs", self.intervalles)
+        histogramme("blockchain_validation_secondes", "Durée de validation d'un bloc", simulation.latences_validation)
+        metrique("blockchain_signatures_verifiees_total", "counter", "Signatures ECDSA vérifiées (hors cache)",
+                 [({}, verification.signatures_verifiees)])
+        metrique("process_resident_memory_bytes", "gauge", "Mémoire résidente du processus",
+                 [({}, memoire_residente())])
+        return "\n".join(lignes) + "\n"
+
+
+class ServeurMetriques:
+    """ Sert GET /metrics sur un thread d'arrière-plan (démon) jusqu'à `fermer` """
+
+    def __init__(self, simulation, port=9100, hote="127.0.0.1"):
+        collecteur = self.collecteur = CollecteurMetriques(simulation)
+
+        class Requete(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                corps = collecteur.rendu().encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(corps)))
+                self.end_headers()
+                self.wfile.write(corps)
+
+            def log_message(self, *args):
+                pass
+
+        self.serveur = ThreadingHTTPServer((hote, port), Requete)
+        self.serveur.daemon_threads = True
+        self.port = self.serveur.server_address[1]
+        self.thread = threading.Thread(target=self.serveur.serve_forever, name="metriques", daemon=True)
+        self.thread.start()
+
+    def fermer(self):
+        self.serveur.shutdown()
+        self.serveur.server_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
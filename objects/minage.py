@@ -0,0 +1,217 @@
+from objects.traceur import trace
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import multiprocessing
+import hashlib
+import struct
+import os
+
+
+# Espace des nonces (entier non signé sur 32 bits comme dans Bitcoin)
+NONCE_MAX = 2 ** 32
+NONCE = struct.Struct("<I")
+
+# Événement d'arrêt et compteurs partagés, transmis à chaque processus au démarrage
+_arret = None
+_compteurs = None
+
+
+def calculer_hash_entete(prefixe, nonce):
+    """ Calcule le double SHA256 (octets bruts) du header binaire : préfixe invariant + nonce """
+    etat = hashlib.sha256(prefixe)
+    etat.update(NONCE.pack(nonce))
+    return hashlib.sha256(etat.digest()).digest()
+
+
+def chercher_nonce(etat, cible, debut, fin):
+    """
+    Boucle chaude de la Proof of Work sur les nonces [debut, fin[
+    `etat` est un objet sha256 ayant déjà absorbé le préfixe du header : il est copié
+    pour chaque nonce au lieu de re-hacher tout le header
+    Retourne (nonce, hash) ou None
+    """
+    sha256 = hashlib.sha256
+    pack = NONCE.pack
+    for nonce in range(debut, fin):
+        h = etat.copy()
+        h.update(pack(nonce))
+        hash = sha256(h.digest()).digest()
+        if hash <= cible:
+            return nonce, hash
+    return None
+
+
+class RechercheHashlib:
+    """ Backend de minage par défaut : hashlib, avec le préfixe du header absorbé une seule fois """
+
+    def __init__(self, prefixe):
+        self.etat = hashlib.sha256(prefixe)
+
+    def chercher(self, cible, debut, fin):
+        return chercher_nonce(self.etat, cible, debut, fin)
+
+
+def obtenir_backend(nom):
+    """ Sélectionne la classe de recherche de nonces ("hashlib" par défaut, "numpy" en option) """
+    if nom == "hashlib":
+        return RechercheHashlib
+    if nom == "numpy":
+        # Import différé : NumPy n'est nécessaire que pour ce backend
+        from objects.sha256_numpy import RechercheNumpy
+        return RechercheNumpy
+    raise ValueError(f"Backend de minage inconnu : {nom}")
+
+
+def repartir_nonces(nb_entetes, nb_processus):
+    """
+    Découpe l'espace des nonces en tranches disjointes, regroupées en une tâche par processus :
+    - chaque header candidat reçoit au moins une tranche, et les processus en surnombre
+      sont répartis à tour de rôle entre les headers
+    - avec plus de headers que de processus, une tâche reçoit plusieurs headers et alterne
+      entre eux lot par lot : tous les candidats progressent en même temps
+    Retourne une liste de tâches, chacune une liste de tranches (indice du header, début, fin)
+    """
+    nb_tranches_total = max(nb_entetes, nb_processus)
+    tranches = []
+    for indice in range(nb_entetes):
+        nb_tranches = len(range(indice, nb_tranches_total, nb_entetes))
+        taille = NONCE_MAX // nb_tranches
+        for j in range(nb_tranches):
+            fin = NONCE_MAX if j == nb_tranches - 1 else (j + 1) * taille
+            tranches.append((j, indice, j * taille, fin))
+    # Entrelacer les headers pour que chacun démarre dès le premier tour
+    tranches.sort()
+    taches = [[] for _ in range(min(nb_processus, len(tranches)))]
+    for numero, (_, indice, debut, fin) in enumerate(tranches):
+        taches[numero % len(taches)].append((indice, debut, fin))
+    return taches
+
+
+def _initialiser_processus(arret, compteurs):
+    global _arret, _compteurs
+    _arret = arret
+    _compteurs = compteurs
+
+
+@trace
+def _chercher_nonce(tranches, cible, taille_lot, backend):
+    """
+    Parcourt les tranches (emplacement, indice du header, préfixe, début, fin) un lot à tour de rôle,
+    et s'arrête dès qu'un processus a trouvé
+    Les tentatives sont publiées sans verrou dans l'emplacement réservé à chaque tranche
+    """
+    Recherche = obtenir_backend(backend)
+    # [emplacement, indice, recherche, prochain nonce, fin]
+    actives = [[emplacement, indice, Recherche(prefixe), debut, fin] for emplacement, indice, prefixe, debut, fin in tranches]
+    while actives:
+        for tranche in list(actives):
+            if _arret.is_set():
+                return None
+            emplacement, indice, recherche, lot, fin = tranche
+            fin_lot = min(lot + taille_lot, fin)
+            trouve = recherche.chercher(cible, lot, fin_lot)
+            if trouve is not None:
+                _arret.set()
+                nonce, hash = trouve
+                _compteurs[emplacement] += nonce - lot + 1
+                return indice, nonce, hash.hex()
+            _compteurs[emplacement] += fin_lot - lot
+            if fin_lot == fin:
+                actives.remove(tranche)
+            else:
+                tranche[3] = fin_lot
+    return None
+
+
+class MoteurMinage:
+    """
+    Moteur de Proof of Work multi-processus :
+    les tranches de nonces sont réparties sur un pool de processus
+    qui s'arrêtent tous via un événement partagé dès qu'un hash valide est trouvé
+    """
+
+    def __init__(self, nb_processus=None, taille_lot=10_000, backend="hashlib"):
+        self.nb_processus = nb_processus or os.cpu_count() or 1
+        self.taille_lot = taille_lot
+        self.backend = backend
+        obtenir_backend(backend)
+        self._contexte = multiprocessing.get_context()
+        self._arret = self._contexte.Event()
+        self._compteurs = None
+        self._executeur = None
+
+    def _pool(self, nb_tranches):
+        # Les compteurs partagés (un par tranche) sont hérités par les processus : le pool est recréé s'il en faut plus
+        if self._compteurs is not None and len(self._compteurs) < nb_tranches:
+            self.fermer()
+        if self._executeur is None:
+            self._compteurs = self._contexte.RawArray('Q', max(nb_tranches, self.nb_processus))
+            self._executeur = ProcessPoolExecutor(
+                max_workers=self.nb_processus,
+                mp_context=self._contexte,
+                initializer=_initialiser_processus,
+                initargs=(self._arret, self._compteurs)
+            )
+        return self._executeur
+
+    def _publier(self, tranches, statistiques, deja_publie):
+        """ Reporte les compteurs des processus dans les statistiques de chaque header candidat """
+        par_entete = [0] * len(statistiques)
+        for emplacement, (indice, _, _) in enumerate(tranches):
+            par_entete[indice] += self._compteurs[emplacement]
+        for indice, stats in enumerate(statistiques):
+            if par_entete[indice] > deja_publie[indice]:
+                stats.publier(par_entete[indice] - deja_publie[indice])
+                deja_publie[indice] = par_entete[indice]
+
+    def miner(self, entetes, cible, is_mining_active=None, statistiques=None):
+        """
+        Cherche un nonce valide pour l'un des headers candidats
+        `statistiques` : une StatistiquesMineur par header, mise à jour pendant la recherche
+        Retourne (indice du header gagnant, nonce, hash) ou None si le minage a été arrêté
+        """
+        taches = repartir_nonces(len(entetes), self.nb_processus)
+        tranches = [tranche for tache in taches for tranche in tache]
+        pool = self._pool(len(tranches))
+        self._arret.clear()
+        for emplacement in range(len(self._compteurs)):
+            self._compteurs[emplacement] = 0
+        deja_publie = [0] * len(entetes)
+        restantes = set()
+        emplacement = 0
+        for tache in taches:
+            arguments = []
+            for indice, debut, fin in tache:
+                arguments.append((emplacement, indice, entetes[indice], debut, fin))
+                emplacement += 1
+            restantes.add(pool.submit(_chercher_nonce, arguments, cible, self.taille_lot, self.backend))
+
+        resultat = None
+        while restantes and resultat is None:
+            terminees, restantes = wait(restantes, timeout=0.1, return_when=FIRST_COMPLETED)
+            for future in terminees:
+                if future.result() is not None and resultat is None:
+                    resultat = future.result()
+            if statistiques is not None:
+                self._publier(tranches, statistiques, deja_publie)
+            # Arrêt anticipé demandé par l'appelant
+            if is_mining_active is not None and not is_mining_active():
+                break
+
+        self._arret.set()
+        wait(restantes)
+        if statistiques is not None:
+            self._publier(tranches, statistiques, deja_publie)
+        return resultat
+
+    def fermer(self):
+        self._arret.set()
+        if self._executeur is not None:
+            self._executeur.shutdown(wait=True)
+            self._executeur = None
+            self._compteurs = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
@@ -1,27 +1,45 @@
-from objects.utilisateur import Utilisateur
+from objects.utilisateur import Utilisateur, GENESIS, RECOMPENSE
 from objects.bloc import Bloc
+from objects.blockchain import Blockchain, IndexSoldes
 from objects.transaction import Transaction
+from objects.minage import NONCE_MAX, calculer_hash_entete, obtenir_backend
+from objects.difficulte import cible_octets
+from objects.telemetrie import StatistiquesMineur
+from objects.verification import verifier_transaction, verifier_emissions, est_emission
+from objects.traceur import trace
+import logging
 import random
-import hashlib
+import time
+
+
+logger = logging.getLogger(__name__)
 
 
 class Mineur(Utilisateur):
-    def __init__(self, nom, difficulte=5):
-        super().__init__(nom)
+    def __init__(self, nom, difficulte=5, backend="hashlib", cle_privee_hex=None, hashrate=1_000_000, graine=None,
+                 trousseau=None):
+        super().__init__(nom, cle_privee_hex, graine, trousseau)
         self.difficulte = difficulte
+        # Puissance déclarée (hashs par seconde), utilisée par la simulation à événements discrets
+        self.hashrate = hashrate
+        # Backend de calcul des hashs : "hashlib" (défaut) ou "numpy" (lots vectorisés)
+        self.backend = backend
+        # Nombre de nonces testés entre deux vérifications d'arrêt (et publications des compteurs)
+        self.taille_lot = 10_000
+        self.statistiques = StatistiquesMineur(nom)
 
 
-    def creer_bloc_genesis(self, utilisateurs):
-        """Crée le premier bloc de la blockchain (bloc genesis) sans le miner"""
-        print("\n" + "="*60)
-        print("🌟 Création du bloc Genesis")
-        print("="*60)
+    def creer_bloc_genesis(self, utilisateurs, aleatoire=random):
+        """Crée le premier bloc de la blockchain (bloc genesis) ; `aleatoire` tire les soldes initiaux"""
+        logger.info("\n" + "="*60)
+        logger.info("🌟 Création du bloc Genesis")
+        logger.info("="*60)
         
         # Transactions Genesis permettent d'initialiser les soldes des utilisateurs
         transactions_genesis = [Transaction(
-            expediteur=Utilisateur("GENESIS"),
+            expediteur=GENESIS,
             destinataire=user,
-            montant=random.uniform(10, 100),
+            montant=aleatoire.uniform(10, 100),
             cle_publique_expediteur="SYSTEM"
         ) for user in utilisateurs]
          
@@ -35,107 +53,154 @@ class Mineur(Utilisateur):
         return self.miner_bloc(bloc_genesis.transactions)
 
     
-    def miner_bloc(self, transactions_en_attente=[], hash_dernier_bloc="0", index_bloc=0, recompense=3.125, difficulte=2, is_mining_active=None):
+    def construire_bloc(self, transactions_en_attente=[], hash_dernier_bloc="0" * 64, index_bloc=0, recompense=3.125, difficulte=2, bits=None):
         """
-        Mine un nouveau bloc :
+        Construit le bloc candidat du mineur :
         1. Regroupe les transactions en attente
         2. Ajoute la transaction de récompense 
-        3. Résout le problème de Proof of Work
-        4. Retourne le bloc validé
         """
         
-        # Créer la transaction de récompense
+        # Calcul des frais de transaction
+        frais_totaux = sum(tx.frais for tx in transactions_en_attente)
+
+        # Créer la transaction de récompense (le hash couvre le montant frais compris)
         transaction_recompense = Transaction(
-            expediteur=Utilisateur("RECOMPENSE"),
+            expediteur=RECOMPENSE,
             destinataire=self,
-            montant=recompense,
+            montant=recompense + frais_totaux,
             cle_publique_expediteur="SYSTEM"
         )
-        
-        # Calcul des frais de transaction
-        frais_totaux = sum(0.0001 for _ in transactions_en_attente)  # 0.0001 BTC par transaction
-        transaction_recompense.montant += frais_totaux
         toutes_transactions = transactions_en_attente + [transaction_recompense]
 
         # Création du bloc
-        bloc = Bloc(
+        return Bloc(
             index=index_bloc,
             transactions=toutes_transactions,
             hash_precedent=hash_dernier_bloc,
-            difficulte=difficulte
+            difficulte=difficulte,
+            bits=bits
         )
+
+    
+    @trace
+    def miner_bloc(self, transactions_en_attente=[], hash_dernier_bloc="0" * 64, index_bloc=0, recompense=3.125, difficulte=2, is_mining_active=None, moteur=None, bits=None):
+        """
+        Mine un nouveau bloc :
+        1. Construit le bloc candidat (transactions + récompense)
+        2. Résout le problème de Proof of Work (dans ce thread, ou sur le pool de processus du moteur)
+        3. Retourne le bloc validé
+        """
+        bloc = self.construire_bloc(transactions_en_attente, hash_dernier_bloc, index_bloc, recompense, difficulte, bits)
         
         # Minage du bloc (Proof of Work)
-        cible = '0' * difficulte
+        cible = cible_octets(bloc.bits)
+        self.statistiques.demarrer_bloc()
+
+        if moteur is not None:
+            resultat = moteur.miner([bloc.entete_prefixe()], cible, is_mining_active, [self.statistiques])
+            if resultat is None:
+                logger.debug("🛑 Mineur %s a arrêté le minage", self.nom)
+                return None
+            _, nonce, hash = resultat
+            self.statistiques.solution_trouvee()
+            logger.info(f"\n✅ Bloc miné par {self.nom}! Nonce trouvé: {nonce}")
+            bloc.nonce = nonce
+            bloc.hash = hash
+            return bloc
+
         tentatives = 0
         nonce = 0
+        # Le préfixe du header est sérialisé et haché une seule fois par bloc
+        Recherche = obtenir_backend(self.backend)
+        recherche = Recherche(bloc.entete_prefixe())
 
         while True:
             # Le minage doit être arrêté si un autre mineur a trouvé le hash
             if is_mining_active is not None and not is_mining_active():
-                print(f"🛑 Mineur {self.nom} a arrêté le minage")
+                logger.debug("🛑 Mineur %s a arrêté le minage", self.nom)
                 return None
 
-            hash = self.calculer_hash(bloc, nonce)
+            # Recherche par lots pour sortir les tests d'arrêt de la boucle chaude
+            fin = min(nonce + self.taille_lot, NONCE_MAX)
+            trouve = recherche.chercher(cible, nonce, fin)
             
-            # Vérifier si le hash commence par le nombre requis de zéros
-            if hash.startswith(cible):
-                print(f"\n✅ Bloc miné par {self.nom}! Nonce trouvé: {nonce}")
+            # Vérifier si le hash est inférieur à la cible
+            if trouve is not None:
+                debut, (nonce, hash) = nonce, trouve
+                self.statistiques.publier(nonce - debut + 1, nonce)
+                self.statistiques.solution_trouvee()
+                logger.info(f"\n✅ Bloc miné par {self.nom}! Nonce trouvé: {nonce}")
                 bloc.nonce = nonce
-                bloc.hash = hash
+                bloc.hash = hash.hex()
                 return bloc
-            else:
-                nonce += 1
-                tentatives += 1
+
+            tentatives += fin - nonce
+            self.statistiques.publier(fin - nonce, fin - 1)
+            nonce = fin
+
+            # Espace des nonces épuisé : on rafraîchit le timestamp du header
+            if nonce == NONCE_MAX:
+                bloc.timestamp = time.time()
+                recherche = Recherche(bloc.entete_prefixe())
+                nonce = 0
             
             # Affichage de la progression
             if tentatives % 100000 == 0:
-                print(f"   {self.nom:<13}: {tentatives:,} tentatives")
+                logger.debug("   %-13s: %s tentatives", self.nom, f"{tentatives:,}")
 
 
     def calculer_hash(self, bloc, nonce):
         """ Calcule le hash du header d'un bloc avec double SHA256 """
-        bits = str(self.difficulte)
-        header = f"{bloc.hash_precedent}{bloc.racine_merkle}{bloc.timestamp}{bits}{nonce}".encode()
-        hash1 = hashlib.sha256(header).digest()
-        hash2 = hashlib.sha256(hash1).hexdigest()
-        return hash2
+        return calculer_hash_entete(bloc.entete_prefixe(), nonce).hex()
 
     
-    def valider_bloc(self, bloc, bloc_precedent):
+    @trace
+    def valider_bloc(self, bloc, bloc_precedent, bits_attendus=None, verificateur=None, verifier_preuve=True,
+                     recompense=3.125, verifier_signatures=True):
         """
         Valide un bloc déjà miné
         Vérifie :
-        - Le hash du bloc respecte la cible
+        - La cible du bloc est celle attendue par l'ajustement de difficulté
+        - Le hash du bloc correspond à son header et respecte sa cible
+          (sauf verifier_preuve=False : blocs de la simulation à événements discrets, dont la découverte est tirée au sort)
         - Le chainage avec le bloc précédent
-        - Toutes les transactions sont valides
+        - Les transactions système se limitent à une récompense d'au plus `recompense` + frais (et au genesis du bloc 0)
+        - Toutes les transactions sont valides (signatures vérifiées par lots sur un pool de processus si un vérificateur est fourni ;
+          sauf verifier_signatures=False : transactions non signées de la simulation à événements discrets)
         """
-        print(f"\n🔍 Validation du bloc #{bloc.index}...")
-        cible = '0' * self.difficulte
-        if not bloc.hash.startswith(cible):
+        logger.debug("\n🔍 Validation du bloc #%s...", bloc.index)
+        if bits_attendus is not None and bloc.bits != bits_attendus:
+            return False
+
+        if self.calculer_hash(bloc, bloc.nonce) != bloc.hash:
+            return False
+        if verifier_preuve and int(bloc.hash, 16) > bloc.cible:
             return False
         
         if bloc.hash_precedent != bloc_precedent.hash:
             return False
 
+        if not verifier_emissions(bloc, recompense):
+            return False
+
+        if not verifier_signatures:
+            return True
+
+        if verificateur is not None:
+            return all(verificateur.verifier_blocs([bloc], arret_premier_echec=True))
+
         for tx in bloc.transactions:
-            if tx.expediteur == "RECOMPENSE":
+            if est_emission(tx):
                 continue
-            if not self.verifier_signature(tx.cle_publique, tx.contenu, tx.signature):
+            if not verifier_transaction(tx):
                 return False 
         return True 
     
 
+    @trace
     def calculer_solde(self, chain, cle_publique):
-        """Calcule le solde d'une clé publique en parcourant toute la blockchain"""
-        solde = 0.0
-        
-        for bloc in chain:
-            for transaction in bloc.transactions:
-                if transaction.destinataire.cle_publique == cle_publique:
-                    solde += transaction.montant
-                if transaction.expediteur.cle_publique == cle_publique:
-                    solde -= transaction.montant
-        
-        return solde
-    
\ No newline at end of file
+        """Solde d'une clé publique (VerifyingKey ou hexadécimal), lu dans l'index des soldes de la blockchain"""
+        if isinstance(chain, Blockchain):
+            return chain.solde(cle_publique)
+        # Simple liste de blocs : l'index est reconstruit en parcourant toute la chaîne
+        return IndexSoldes.depuis_blocs(chain).solde(cle_publique)
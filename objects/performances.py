@@ -0,0 +1,317 @@
+"""
+Bancs d'essai des primitives (hash, signatures, soldes, blocs, validation, cycle de Simulation) avec comparaison à une référence
+- chaque exécution chronométrée enchaîne assez d'opérations pour dépasser largement la résolution de l'horloge
+- la comparaison (optionnelle, --reference) porte sur la durée minimale par opération, ramenée à la vitesse de la machine
+  par un étalonnage, et une régression n'est retenue que si elle se confirme en relançant le banc
+"""
+
+from objects.utilisateur import Utilisateur
+from objects.transaction import Transaction
+from objects.bloc import Bloc
+from objects.blockchain import Blockchain
+from objects.mineur import Mineur
+from objects.mempool import Mempool
+from objects.charge import GenerateurCharge, lire_charge
+from objects.difficulte import Reciblage, bits_depuis_zeros
+from objects.verification import cache_signatures
+from objects.telemetrie import centile
+import argparse
+import hashlib
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+
+def mesurer(fonction, repetitions=20, echauffement=3, operations=1, preparer=None):
+    """
+    Exécute `fonction` `echauffement` fois sans mesure puis `repetitions` fois chronométrées (perf_counter)
+    `preparer`, appelé hors chronométrage avant chaque exécution, fournit les arguments de `fonction`
+    Durées en secondes par exécution ; `operations` est le nombre d'opérations d'une exécution
+    """
+    durees = []
+    for i in range(echauffement + repetitions):
+        arguments = preparer() if preparer is not None else ()
+        debut = time.perf_counter()
+        fonction(*arguments)
+        duree = time.perf_counter() - debut
+        if i >= echauffement:
+            durees.append(duree)
+    mediane = statistics.median(durees)
+    return {
+        'repetitions': repetitions,
+        'operations': operations,
+        'par_operation': min(durees) / operations,
+        'mediane': mediane,
+        'p95': centile(durees, 95),
+        'minimum': min(durees),
+        'moyenne': statistics.fmean(durees),
+        'operations_par_seconde': operations / mediane if mediane > 0 else float('inf'),
+    }
+
+
+# Jeux de données partagés par les bancs (construits une seule fois)
+
+_comptes = []
+
+
+def _utilisateurs():
+    if not _comptes:
+        _comptes.extend(Utilisateur(f"Banc_{i}", graine="performances") for i in range(10))
+    return _comptes
+
+
+def _transactions(nombre, signees=True):
+    """ `nombre` transactions, construites à partir de 100 transactions distinctes (signées une seule fois) """
+    utilisateurs = _utilisateurs()
+    modeles = []
+    for i in range(min(nombre, 100)):
+        expediteur, destinataire = utilisateurs[i % 10], utilisateurs[(i + 1) % 10]
+        tx = Transaction(expediteur, destinataire, 0.5 + i / 100, expediteur.cle_publique_hex, 0.0001, timestamp=float(i))
+        if signees:
+            tx.signature = expediteur.signe(tx)
+        modeles.append(tx)
+    return [modeles[i % len(modeles)] for i in range(nombre)]
+
+
+def _chaine(nb_blocs=100, nb_transactions=10):
+    """ Blockchain de `nb_blocs` blocs non minés (les soldes ne dépendent pas de la preuve de travail) """
+    blockchain = Blockchain()
+    hash_precedent = "0" * 64
+    for index in range(nb_blocs):
+        bloc = Bloc(index, _transactions(nb_transactions, signees=False), hash_precedent)
+        bloc.hash = f"{index:064x}"
+        blockchain.append(bloc)
+        hash_precedent = bloc.hash
+    return blockchain
+
+
+# Bancs : chacun retourne (fonction, nombre d'opérations par exécution, preparer)
+
+def banc_calculer_hash():
+    mineur = Mineur("Banc_Mineur", graine="performances")
+    bloc = Bloc(1, _transactions(10), "0" * 64)
+    return lambda: [mineur.calculer_hash(bloc, nonce) for nonce in range(1000)], 1000, None
+
+
+def banc_signe():
+    utilisateur = _utilisateurs()[0]
+    tx = _transactions(1)[0]
+    return lambda: [utilisateur.signe(tx) for _ in range(20)], 20, None
+
+
+def banc_verifier_signature():
+    tx = _transactions(1)[0]
+    return lambda: [Utilisateur.verifier_signature(tx.cle_publique, tx.contenu, tx.signature) for _ in range(20)], 20, None
+
+
+def banc_calculer_solde():
+    mineur = Mineur("Banc_Mineur", graine="performances")
+    blockchain = _chaine()
+    cle = _utilisateurs()[0].cle_publique_hex
+    return lambda: [mineur.calculer_solde(blockchain, cle) for _ in range(1000)], 1000, None
+
+
+def banc_calculer_solde_liste():
+    """ Solde sur une simple liste de blocs : l'index est reconstruit en parcourant les 100 blocs """
+    mineur = Mineur("Banc_Mineur", graine="performances")
+    blocs = list(_chaine())
+    cle = _utilisateurs()[0].cle_publique_hex
+    return lambda: [mineur.calculer_solde(blocs, cle) for _ in range(10)], 10, None
+
+
+def _banc_bloc(nb_transactions, operations=1):
+    def banc():
+        transactions = _transactions(nb_transactions)
+        return lambda: [Bloc(1, list(transactions), "0" * 64) for _ in range(operations)], operations, None
+    return banc
+
+
+def _bloc_mine():
+    """ Bloc de 100 transactions signées distinctes, miné à 1 zéro, et son prédécesseur """
+    mineur = Mineur("Banc_Mineur", graine="performances")
+    precedent = Bloc(0, [], "0" * 64)
+    precedent.hash = "0" * 64
+    return mineur, mineur.miner_bloc(_transactions(100), precedent.hash, 1, difficulte=1), precedent
+
+
+def banc_valider_bloc():
+    """ Validation avec toutes les signatures à vérifier (cache des signatures vidé avant chaque exécution) """
+    mineur, bloc, precedent = _bloc_mine()
+
+    def preparer():
+        cache_signatures.vider()
+        return ()
+
+    return lambda: mineur.valider_bloc(bloc, precedent), 1, preparer
+
+
+def banc_valider_bloc_cache():
+    """ Validation d'un bloc dont les transactions ont été vérifiées à leur entrée dans le mempool """
+    mineur, bloc, precedent = _bloc_mine()
+    return lambda: [mineur.valider_bloc(bloc, precedent) for _ in range(10)], 10, None
+
+
+def banc_rejouer_charge():
+    """
+    Rejoue une charge générée (500 transactions entre 50 comptes, fichier de objects.charge) : lecture du fichier,
+    mempool, blocs de 100 transactions aux meilleurs frais et index des soldes ; signatures déjà vérifiées
+    (leur coût est mesuré par verifier_signature)
+    """
+    dossier = tempfile.TemporaryDirectory()
+    fichier = os.path.join(dossier.name, "charge.bin")
+    with GenerateurCharge(50, graine="performances", nb_processus=1) as generateur:
+        nombre = generateur.ecrire(fichier, 500)
+
+    def rejouer():
+        mempool = Mempool()
+        for tx in lire_charge(fichier):
+            mempool.ajouter(tx)
+        blockchain = Blockchain()
+        while len(mempool):
+            bloc = Bloc(len(blockchain), mempool.select_for_block(100), "0" * 64)
+            bloc.hash = f"{len(blockchain):064x}"
+            blockchain.append(bloc)
+            mempool.retirer_bloc(bloc)
+        # Le dossier temporaire vit aussi longtemps que le banc
+        return dossier
+
+    return rejouer, nombre, None
+
+
+def banc_cycle_simulation():
+    """ Un bloc complet de Simulation (transactions, minage par threads, validation, instantané) à 3 zéros """
+    # Import à la demande : main importe tous les modes de la simulation
+    from main import Simulation
+    dossiers = []
+
+    def preparer():
+        dossier = tempfile.TemporaryDirectory()
+        dossiers.append(dossier)
+        simulation = Simulation(dossier_donnees=dossier.name, graine="performances")
+        simulation.pause_transactions = 0
+        simulation.reciblage = Reciblage(bits_depuis_zeros(3), simulation.temps_bloc_cible, intervalle=5)
+        simulation.bits = simulation.reciblage.bits_initiaux
+        return (simulation,)
+
+    return lambda simulation: simulation.run(1), 1, preparer
+
+
+# Nom -> (constructeur du banc, nombre de répétitions par défaut)
+BANCS = {
+    'calculer_hash': (banc_calculer_hash, 20),
+    'signe': (banc_signe, 20),
+    'verifier_signature': (banc_verifier_signature, 20),
+    'calculer_solde': (banc_calculer_solde, 50),
+    'calculer_solde_liste': (banc_calculer_solde_liste, 50),
+    'bloc_10': (_banc_bloc(10, 100), 50),
+    'bloc_1000': (_banc_bloc(1000), 50),
+    'bloc_10000': (_banc_bloc(10_000), 10),
+    'valider_bloc': (banc_valider_bloc, 20),
+    'valider_bloc_cache': (banc_valider_bloc_cache, 50),
+    'rejouer_charge': (banc_rejouer_charge, 10),
+    'cycle_simulation': (banc_cycle_simulation, 5),
+}
+
+
+def etalonner(repetitions=20):
+    """ Durée minimale d'une charge fixe (boucle Python et SHA256) : échelle de vitesse de la machine """
+    def charge():
+        etat = hashlib.sha256()
+        for i in range(20_000):
+            etat.update(i.to_bytes(4, 'little'))
+    return mesurer(charge, repetitions)['minimum']
+
+
+def executer(noms=None, repetitions=None, echauffement=3):
+    """ Exécute les bancs `noms` (tous par défaut), retourne le rapport JSON-sérialisable """
+    resultats = {}
+    for nom in noms or BANCS:
+        construire, repetitions_defaut = BANCS[nom]
+        fonction, operations, preparer = construire()
+        resultats[nom] = mesurer(fonction, repetitions or repetitions_defaut, echauffement, operations, preparer)
+    return {
+        'machine': {
+            'python': platform.python_version(),
+            'plateforme': platform.platform(),
+            'processeurs': os.cpu_count(),
+            'etalonnage': etalonner(),
+        },
+        'horodatage': time.time(),
+        'bancs': resultats,
+    }
+
+
+def comparer(rapport, reference, tolerance=0.25):
+    """
+    Bancs dont la durée minimale par opération dépasse celle de la référence de plus de `tolerance`,
+    la référence étant d'abord ramenée à la vitesse de cette machine (rapport des étalonnages) :
+    [(nom, référence ajustée, mesure)]
+    """
+    echelle = rapport['machine']['etalonnage'] / reference['machine']['etalonnage']
+    regressions = []
+    for nom, resultat in rapport['bancs'].items():
+        precedent = reference['bancs'].get(nom)
+        if precedent is None:
+            continue
+        attendu = precedent['par_operation'] * echelle
+        if resultat['par_operation'] > attendu * (1 + tolerance):
+            regressions.append((nom, attendu, resultat['par_operation']))
+    return regressions
+
+
+def confirmer(regressions, rapport, reference, tolerance=0.25, repetitions=None, echauffement=3):
+    """ Relance les bancs en régression et ne garde que ceux dont la meilleure des deux mesures régresse encore """
+    nouveau = executer([nom for nom, _, _ in regressions], repetitions, echauffement)
+    for nom, resultat in nouveau['bancs'].items():
+        if resultat['par_operation'] > rapport['bancs'][nom]['par_operation']:
+            nouveau['bancs'][nom] = rapport['bancs'][nom]
+    # Étalonnage le plus rapide des deux passes, comme pour les bancs
+    nouveau['machine']['etalonnage'] = min(nouveau['machine']['etalonnage'], rapport['machine']['etalonnage'])
+    return comparer(nouveau, reference, tolerance)
+
+
+# Rapport de référence versionné (comparaison à la demande), régénéré avec --sortie quand une baisse de performance est voulue
+REFERENCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "performances_reference.json")
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Bancs d'essai des primitives de la blockchain")
+    parser.add_argument("--bancs", nargs="+", choices=list(BANCS), default=None, help="bancs à exécuter (tous par défaut)")
+    parser.add_argument("--repetitions", type=int, default=None, help="exécutions mesurées par banc")
+    parser.add_argument("--echauffement", type=int, default=3, help="exécutions non mesurées avant la mesure")
+    parser.add_argument("--sortie", default=None, help="fichier JSON du rapport")
+    parser.add_argument("--reference", default=None,
+                        help="rapport JSON de référence (par exemple objects/performances_reference.json) : échec en cas de régression confirmée")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="ralentissement toléré par opération (0.25 = 25 %%)")
+    args = parser.parse_args(arguments)
+    logging.basicConfig(level="WARNING", format="%(message)s")
+
+    rapport = executer(args.bancs, args.repetitions, args.echauffement)
+    for nom, resultat in rapport['bancs'].items():
+        print(f"⏱️ {nom:<22} {resultat['par_operation'] * 1e6:12.3f} µs/op   médiane {resultat['mediane'] * 1000:10.3f} ms   "
+              f"p95 {resultat['p95'] * 1000:10.3f} ms   {resultat['operations_par_seconde']:>14,.0f} op/s")
+    if args.sortie:
+        with open(args.sortie, 'w', encoding='utf-8') as f:
+            json.dump(rapport, f, indent=2)
+
+    if args.reference:
+        with open(args.reference, encoding='utf-8') as f:
+            reference = json.load(f)
+        regressions = comparer(rapport, reference, args.tolerance)
+        if regressions:
+            regressions = confirmer(regressions, rapport, reference, args.tolerance, args.repetitions, args.echauffement)
+        for nom, precedent, mesure in regressions:
+            print(f"❌ Régression {nom} : {precedent * 1e6:.3f} µs/op -> {mesure * 1e6:.3f} µs/op")
+        if regressions:
+            return 1
+        print("✅ Aucune régression par rapport à la référence")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,36 @@
+from objects.traceur import trace
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
 
 
 
 def afficher_soldes(simulation):
-    print(f"\n{'-'*60}\n💰 SOLDES :\n{'-'*60}")
-    print("\nUtilisateurs:")
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    registre = getattr(simulation.blockchain, 'registre', None)
+    if registre is not None:
+        # Tous les soldes en une seule passe vectorisée sur la copie en colonnes
+        soldes = registre.soldes()
+        solde = lambda compte: soldes.get(compte.cle_publique_hex, 0.0)
+    else:
+        solde = lambda compte: simulation.mineurs[0].calculer_solde(simulation.blockchain, compte.cle_publique_hex)
+
+    logger.info(f"\n{'-'*60}\n💰 SOLDES :\n{'-'*60}")
+    logger.info("\nUtilisateurs:")
     for user in simulation.utilisateurs:
-        print(f"  {user.nom}: {simulation.mineurs[0].calculer_solde(simulation.blockchain, user.cle_publique):.2f} BTC")
-    print("\nMineurs:")
+        logger.info(f"  {user.nom}: {solde(user):.2f} BTC")
+    logger.info("\nMineurs:")
     for mineur in simulation.mineurs:
-        print(f"  {mineur.nom}: {simulation.mineurs[0].calculer_solde(simulation.blockchain, mineur.cle_publique):.2f} BTC")
-    print()
+        logger.info(f"  {mineur.nom}: {solde(mineur):.2f} BTC")
+    logger.info("")
 
 
 
+@trace
 def sauvegarder_blockchain(chain, fichier='blockchain.txt'):
     """Sauvegarde la blockchain dans un fichier texte"""
     
@@ -29,7 +47,7 @@ def sauvegarder_blockchain(chain, fichier='blockchain.txt'):
             f.write(f"Hash bloc: {bloc.hash}\n")
             f.write(f"Timestamp: {bloc.timestamp}\n")
             f.write(f"Nonce: {bloc.nonce}\n")
-            f.write(f"Difficulté: {bloc.difficulte}\n")
+            f.write(f"Bits: {bloc.bits:#010x} (difficulté {bloc.difficulte:,.0f})\n")
             f.write(f"Racine Merkle: {bloc.racine_merkle}\n")
             f.write(f"\nTransactions ({len(bloc.transactions)}):\n")
             f.write("-"*80 + "\n")
@@ -39,10 +57,11 @@ def sauvegarder_blockchain(chain, fichier='blockchain.txt'):
                 f.write(f"  Expéditeur: {tx.expediteur}\n")
                 f.write(f"  Destinataire: {tx.destinataire}\n")
                 f.write(f"  Montant: {tx.montant} BTC\n")
+                f.write(f"  Frais: {tx.frais} BTC\n")
                 f.write(f"  Hash: {tx.hash_transaction}\n")
                 if tx.signature:
                     f.write(f"  Signature: {tx.signature[:50]}...\n")
             f.write("\n")
     
-    print(f"\n💾 Blockchain sauvegardée dans {fichier}")
+    logger.info(f"\n💾 Blockchain sauvegardée dans {fichier}")
     
@@ -0,0 +1,97 @@
+from objects.transaction import en_btc
+import numpy as np
+
+
+# Une ligne par transaction, montants en satoshis entiers
+TYPE_LIGNE = np.dtype([
+    ('bloc', np.uint64),
+    ('expediteur', np.uint32),
+    ('destinataire', np.uint32),
+    ('montant', np.int64),
+    ('frais', np.int64),
+    ('timestamp', np.float64),
+])
+
+
+class RegistreColonnes:
+    """
+    Copie en colonnes NumPy des transactions de la chaîne, pour l'analyse des longues simulations
+    - les comptes sont numérotés (identifiant entier) dans l'ordre de leur première apparition
+    - le tableau grandit par tranches de `pas` lignes, sans recopie à chaque bloc
+    - les soldes de tous les comptes sont calculés en une passe vectorisée (np.add.at, exacte en entiers)
+    - les transactions d'une plage de blocs sont une simple tranche du tableau
+    """
+
+    def __init__(self, pas=4096):
+        self.pas = pas
+        self._lignes = np.zeros(pas, dtype=TYPE_LIGNE)
+        self.nb_lignes = 0
+        # Première ligne de chaque bloc (la ligne de fin est celle du bloc suivant)
+        self.debuts_blocs = []
+        # Clé publique hexadécimale <-> identifiant entier
+        self.identifiants = {}
+        self.cles = []
+
+    @classmethod
+    def depuis_blocs(cls, blocs, pas=4096):
+        registre = cls(pas)
+        for bloc in blocs:
+            registre.ajouter_bloc(bloc)
+        return registre
+
+    def identifiant(self, cle_publique_hex):
+        identifiant = self.identifiants.get(cle_publique_hex)
+        if identifiant is None:
+            identifiant = self.identifiants[cle_publique_hex] = len(self.cles)
+            self.cles.append(cle_publique_hex)
+        return identifiant
+
+    def ajouter_bloc(self, bloc):
+        nb_transactions = len(bloc.transactions)
+        if self.nb_lignes + nb_transactions > len(self._lignes):
+            tranches = -(-(self.nb_lignes + nb_transactions) // self.pas)
+            lignes = np.zeros(tranches * self.pas, dtype=TYPE_LIGNE)
+            lignes[:self.nb_lignes] = self._lignes[:self.nb_lignes]
+            self._lignes = lignes
+
+        self.debuts_blocs.append(self.nb_lignes)
+        nouvelles = self._lignes[self.nb_lignes:self.nb_lignes + nb_transactions]
+        nouvelles['bloc'] = bloc.index
+        nouvelles['expediteur'] = [self.identifiant(tx.cle_expediteur.hex()) for tx in bloc.transactions]
+        nouvelles['destinataire'] = [self.identifiant(tx.cle_destinataire.hex()) for tx in bloc.transactions]
+        nouvelles['montant'] = [tx.montant_satoshis for tx in bloc.transactions]
+        nouvelles['frais'] = [tx.frais_satoshis for tx in bloc.transactions]
+        nouvelles['timestamp'] = [tx.timestamp for tx in bloc.transactions]
+        self.nb_lignes += nb_transactions
+
+    def retirer_bloc(self):
+        """ Retire les lignes du dernier bloc ajouté """
+        self.nb_lignes = self.debuts_blocs.pop()
+
+    @property
+    def lignes(self):
+        """ Vue (sans copie) sur les transactions enregistrées """
+        return self._lignes[:self.nb_lignes]
+
+    def plage_blocs(self, debut, fin=None):
+        """ Transactions des blocs numéros `debut` (inclus) à `fin` (exclu), en tranche du tableau """
+        fin = len(self.debuts_blocs) if fin is None else min(fin, len(self.debuts_blocs))
+        if debut >= fin:
+            return self._lignes[:0]
+        ligne_fin = self.debuts_blocs[fin] if fin < len(self.debuts_blocs) else self.nb_lignes
+        return self._lignes[self.debuts_blocs[debut]:ligne_fin]
+
+    def soldes_satoshis(self, lignes=None):
+        """ Solde de chaque compte (indexé par identifiant) sur `lignes` (toute la chaîne par défaut) """
+        lignes = self.lignes if lignes is None else lignes
+        soldes = np.zeros(len(self.cles), dtype=np.int64)
+        np.add.at(soldes, lignes['destinataire'], lignes['montant'])
+        np.subtract.at(soldes, lignes['expediteur'], lignes['montant'] + lignes['frais'])
+        return soldes
+
+    def soldes(self):
+        """ Soldes en BTC par clé publique hexadécimale """
+        return {cle: en_btc(int(solde)) for cle, solde in zip(self.cles, self.soldes_satoshis())}
+
+    def __len__(self):
+        return self.nb_lignes
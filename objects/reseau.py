@@ -0,0 +1,301 @@
+from objects.utilisateur import Utilisateur
+from objects.transaction import Transaction, TAILLE_TRANSACTION
+from objects.bloc import FORMAT_BLOC
+from objects.blockchain import Blockchain
+from objects.arbre_blocs import ArbreBlocs
+from objects.mineur import Mineur
+from objects.mempool import Mempool
+from objects.difficulte import Reciblage, cible_vers_bits, CIBLE_MAX
+from objects.evenements import taux_decouverte
+from objects.verification import verifier_transaction
+from objects.telemetrie import centile
+import asyncio
+import logging
+import random
+import selectors
+
+
+logger = logging.getLogger(__name__)
+
+
+class _SelecteurVirtuel:
+    """
+    Sélecteur sans attente réelle : quand la boucle devrait dormir jusqu'au prochain timer,
+    l'horloge virtuelle avance directement jusqu'à lui
+    """
+
+    def __init__(self):
+        self._reel = selectors.DefaultSelector()
+        self.boucle = None
+
+    def select(self, timeout=None):
+        evenements = self._reel.select(0)
+        if not evenements and timeout:
+            self.boucle.maintenant += timeout
+        return evenements
+
+    def __getattr__(self, nom):
+        return getattr(self._reel, nom)
+
+
+class BoucleVirtuelle(asyncio.SelectorEventLoop):
+    """
+    Boucle asyncio en temps simulé : asyncio.sleep, call_later et les délais réseau
+    ne coûtent rien en temps réel, seul l'ordre des événements compte
+    """
+
+    def __init__(self):
+        selecteur = _SelecteurVirtuel()
+        super().__init__(selecteur)
+        selecteur.boucle = self
+        self.maintenant = 0.0
+
+    def time(self):
+        return self.maintenant
+
+
+def taille_message(objet):
+    """ Taille en octets d'une transaction ou d'un bloc au format binaire """
+    if isinstance(objet, Transaction):
+        return TAILLE_TRANSACTION
+    return FORMAT_BLOC.size + len(objet.transactions) * TAILLE_TRANSACTION
+
+
+class Noeud:
+    """
+    Nœud du réseau : sa propre chaîne, son propre mempool et son propre mineur
+    - les transactions et les blocs reçus sont relayés une seule fois à tous les voisins (gossip),
+      une fois validés : un bloc invalide ou dont le parent manque encore n'est pas relayé
+    - les blocs reçus sont rangés dans un arbre (ArbreBlocs) : la chaîne au plus grand travail cumulé
+      l'emporte, une réorganisation ne retire et n'ajoute que les blocs divergents
+    """
+
+    def __init__(self, reseau, numero, hashrate):
+        self.reseau = reseau
+        self.numero = numero
+        self.mineur = Mineur(f"Noeud_{numero}", hashrate=hashrate, graine=reseau.graine)
+        self.blockchain = Blockchain()
+        self.arbre = None
+        self.mempool = Mempool(taille_max=5000)
+        self.voisins = []
+        # Bande passante montante : instant où le lien sortant du nœud sera libre
+        self.lien_libre = 0.0
+        self.vus = set()
+        # Blocs reçus pas encore relayés (en attente de leur parent) : hash -> bloc
+        self.en_attente = {}
+        self.nouveau_sommet = asyncio.Event()
+
+    # Réseau
+
+    def diffuser(self, objet, origine=None):
+        """ Envoie un objet à tous les voisins sauf celui dont il provient, l'un après l'autre sur le lien montant """
+        boucle = asyncio.get_running_loop()
+        duree_envoi = taille_message(objet) / self.reseau.bande_passante
+        for voisin, latence in self.voisins:
+            if voisin is origine:
+                continue
+            self.lien_libre = max(self.lien_libre, boucle.time()) + duree_envoi
+            boucle.call_at(self.lien_libre + latence, voisin.recevoir, objet, self)
+
+    def recevoir(self, objet, origine=None):
+        cle = objet.hash_octets if isinstance(objet, Transaction) else objet.hash
+        if cle in self.vus:
+            return
+        self.vus.add(cle)
+        if isinstance(objet, Transaction):
+            if verifier_transaction(objet):
+                self.mempool.ajouter(objet)
+                self.diffuser(objet, origine)
+        else:
+            self.reseau.noter_reception(objet, self)
+            for bloc in self.recevoir_bloc(objet):
+                self.diffuser(bloc, origine if bloc is objet else None)
+
+    # Chaîne
+
+    def demarrer(self, genesis):
+        self.blockchain.append(genesis)
+        self.arbre = ArbreBlocs(self.blockchain, valider=self.valider)
+        self.vus.add(genesis.hash)
+
+    def valider(self, bloc, bloc_precedent):
+        bits = self.reseau.reciblage.prochains_bits(self.blockchain)
+        return self.mineur.valider_bloc(bloc, bloc_precedent, bits_attendus=bits, verifier_preuve=False,
+                                         recompense=self.reseau.recompense_bloc)
+
+    def recevoir_bloc(self, bloc):
+        """ Range un bloc dans l'arbre, retourne les blocs acceptés à relayer (lui et les orphelins qu'il rattache) """
+        self.en_attente[bloc.hash] = bloc
+        retires, ajoutes = self.arbre.ajouter(bloc)
+        # Les transactions des blocs abandonnés retournent dans le mempool (sauf celles reprises par la branche)
+        for bloc_retire in retires:
+            for tx in bloc_retire.transactions:
+                if not tx.est_systeme:
+                    self.mempool.ajouter(tx)
+        for bloc_ajoute in ajoutes:
+            self.mempool.retirer_bloc(bloc_ajoute)
+        if retires:
+            self.reseau.reorganisations += 1
+            if ajoutes and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("🔀 Noeud %s : réorganisation de %s bloc(s) vers %s", self.numero, len(retires), ajoutes[-1].hash)
+        if ajoutes:
+            self.nouveau_sommet.set()
+
+        a_relayer = []
+        for hash, recu in list(self.en_attente.items()):
+            if hash in self.arbre.invalides:
+                del self.en_attente[hash]
+            elif hash in self.arbre:
+                del self.en_attente[hash]
+                if self._valide_hors_chaine(recu):
+                    a_relayer.append(recu)
+        # Parents avant enfants, pour que les voisins puissent les rattacher dès réception
+        return sorted(a_relayer, key=lambda recu: recu.index)
+
+    def _valide_hors_chaine(self, bloc):
+        """
+        Un bloc de la chaîne active a déjà été validé par l'arbre ; un bloc d'une branche moins travaillée
+        n'est validé par l'arbre qu'à la réorganisation, il est vérifié ici sans la cible attendue
+        (qui dépend de sa branche)
+        """
+        if bloc.hash not in self.arbre.hors_chaine:
+            return True
+        precedent = self.arbre.hors_chaine.get(bloc.hash_precedent)
+        if precedent is None:
+            precedent = self.blockchain[self.arbre.entetes[bloc.hash_precedent][1]]
+        return self.mineur.valider_bloc(bloc, precedent, verifier_preuve=False, recompense=self.reseau.recompense_bloc)
+
+    # Minage
+
+    async def miner(self, aleatoire):
+        """ Découverte d'un bloc tirée selon la loi exponentielle, recommencée à chaque nouveau sommet """
+        boucle = asyncio.get_running_loop()
+        while True:
+            self.nouveau_sommet.clear()
+            bits = self.reseau.reciblage.prochains_bits(self.blockchain)
+            delai = aleatoire.expovariate(taux_decouverte(self.mineur.hashrate, bits))
+            try:
+                await asyncio.wait_for(self.nouveau_sommet.wait(), delai)
+                continue
+            except asyncio.TimeoutError:
+                pass
+
+            bloc = self.mineur.construire_bloc(
+                transactions_en_attente=self.mempool.select_for_block(self.reseau.max_transactions_par_bloc),
+                hash_dernier_bloc=self.blockchain[-1].hash,
+                index_bloc=len(self.blockchain),
+                recompense=self.reseau.recompense_bloc,
+                bits=bits
+            )
+            bloc.timestamp = self.reseau.debut + boucle.time()
+            bloc.nonce = aleatoire.getrandbits(32)
+            bloc.hash = self.mineur.calculer_hash(bloc, bloc.nonce)
+            self.reseau.noter_minage(bloc, self)
+            self.recevoir(bloc)
+
+
+class Reseau:
+    """
+    Réseau de nœuds simulé avec asyncio en temps virtuel
+    - graphe aléatoire où chaque nœud a au moins `degre` voisins
+    - chaque lien a une latence tirée dans `latence` (secondes) ; l'envoi d'un message occupe
+      le lien montant de l'émetteur pendant taille / `bande_passante` (octets par seconde)
+    - la cible initiale vise un bloc toutes les `temps_bloc_cible` secondes pour la puissance totale
+    """
+
+    def __init__(self, nb_noeuds=100, degre=8, latence=(0.02, 0.2), bande_passante=1_000_000, hashrates=None,
+                 temps_bloc_cible=10.0, debit_transactions=2.0, nb_utilisateurs=50, graine=None):
+        self.aleatoire = random.Random(graine)
+        self.graine = graine
+        self.bande_passante = bande_passante
+        self.debit_transactions = debit_transactions
+        self.max_transactions_par_bloc = 10
+        self.recompense_bloc = 3.125
+        self.reorganisations = 0
+        self.mines = {}
+        self.receptions = {}
+
+        hashrates = hashrates or [1_000_000] * nb_noeuds
+        hashs_par_bloc = sum(hashrates) * temps_bloc_cible
+        bits = cible_vers_bits(min(int(2 ** 256 / hashs_par_bloc) - 1, CIBLE_MAX))
+        self.reciblage = Reciblage(bits, temps_bloc_cible, intervalle=10)
+
+        self.utilisateurs = [Utilisateur(f"Utilisateur_{i}", graine=graine) for i in range(nb_utilisateurs)]
+        self.noeuds = [Noeud(self, i, hashrate) for i, hashrate in enumerate(hashrates)]
+
+        # Bloc genesis commun à tous les nœuds
+        genesis = self.noeuds[0].mineur.creer_bloc_genesis(self.utilisateurs, self.aleatoire)
+        self.debut = genesis.timestamp
+        for noeud in self.noeuds:
+            noeud.demarrer(genesis)
+
+        # Chaque nœud se connecte à `degre` voisins (liens bidirectionnels)
+        for noeud in self.noeuds:
+            while len(noeud.voisins) < degre:
+                autre = self.aleatoire.choice(self.noeuds)
+                if autre is noeud or any(voisin is autre for voisin, _ in noeud.voisins):
+                    continue
+                delai = self.aleatoire.uniform(*latence)
+                noeud.voisins.append((autre, delai))
+                autre.voisins.append((noeud, delai))
+
+    def noter_minage(self, bloc, noeud):
+        self.mines[bloc.hash] = (asyncio.get_running_loop().time(), noeud.numero)
+        self.receptions[bloc.hash] = []
+
+    def noter_reception(self, bloc, noeud):
+        instant, auteur = self.mines[bloc.hash]
+        if noeud.numero != auteur:
+            self.receptions[bloc.hash].append(asyncio.get_running_loop().time() - instant)
+
+    async def emettre_transactions(self):
+        """ Transactions aléatoires soumises à un nœud au hasard (processus de Poisson) """
+        while True:
+            await asyncio.sleep(self.aleatoire.expovariate(self.debit_transactions))
+            expediteur, destinataire = self.aleatoire.sample(self.utilisateurs, 2)
+            tx = Transaction(expediteur, destinataire, round(self.aleatoire.uniform(0.01, 0.5), 2),
+                             expediteur.cle_publique_hex, round(self.aleatoire.uniform(0.00005, 0.0005), 6))
+            tx.signature = expediteur.signe(tx)
+            self.aleatoire.choice(self.noeuds).recevoir(tx)
+
+    async def _executer(self, duree):
+        taches = [asyncio.ensure_future(noeud.miner(random.Random(self.aleatoire.random()))) for noeud in self.noeuds]
+        taches.append(asyncio.ensure_future(self.emettre_transactions()))
+        await asyncio.sleep(duree)
+        for tache in taches:
+            tache.cancel()
+        await asyncio.gather(*taches, return_exceptions=True)
+
+    def executer(self, duree):
+        """ Simule `duree` secondes de réseau et retourne le rapport """
+        boucle = BoucleVirtuelle()
+        try:
+            boucle.run_until_complete(self._executer(duree))
+        finally:
+            boucle.close()
+        return self.rapport()
+
+    def rapport(self):
+        """ Taux d'orphelins (blocs minés hors de la meilleure chaîne) et centiles de propagation """
+        meilleur = max(self.noeuds, key=lambda noeud: noeud.arbre.travail_cumule(noeud.arbre.sommet))
+        meilleure = meilleur.blockchain
+        principaux = {bloc.hash for bloc in meilleure}
+        orphelins = sum(1 for hash in self.mines if hash not in principaux)
+        delais = [delai for receptions in self.receptions.values() for delai in receptions]
+        # Délai pour qu'un bloc atteigne 90 % des nœuds
+        couverture = [
+            centile(receptions, 90) for receptions in self.receptions.values()
+            if len(receptions) >= 0.9 * (len(self.noeuds) - 1)
+        ]
+        sommet = meilleure[-1].hash
+        return {
+            'noeuds': len(self.noeuds),
+            'blocs_mines': len(self.mines),
+            'hauteur': len(meilleure) - 1,
+            'blocs_orphelins': orphelins,
+            'taux_orphelins': orphelins / len(self.mines) if self.mines else 0.0,
+            'reorganisations': self.reorganisations,
+            'propagation': {p: centile(delais, p) for p in (50, 90, 99)},
+            'propagation_90_noeuds': {p: centile(couverture, p) for p in (50, 90, 99)},
+            'consensus': sum(1 for noeud in self.noeuds if noeud.blockchain[-1].hash == sommet) / len(self.noeuds),
+        }
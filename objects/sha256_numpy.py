@@ -0,0 +1,94 @@
+"""Double SHA256 vectorisé avec NumPy : un lot entier de nonces est haché à chaque appel"""
+
+import numpy as np
+
+
+K = np.array([
+    0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
+    0xd807aa98, 0x12835b01, 0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7, 0xc19bf174,
+    0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc, 0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da,
+    0x983e5152, 0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147, 0x06ca6351, 0x14292967,
+    0x27b70a85, 0x2e1b2138, 0x4d2c6dfc, 0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
+    0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819, 0xd6990624, 0xf40e3585, 0x106aa070,
+    0x19a4c116, 0x1e376c08, 0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f, 0x682e6ff3,
+    0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2,
+], dtype=np.uint32)
+
+H0 = np.array([
+    0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a, 0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19,
+], dtype=np.uint32)
+
+# Rembourrage du second SHA256 (entrée de 32 octets = 256 bits)
+PADDING_32_OCTETS = np.array([0x80000000, 0, 0, 0, 0, 0, 0, 256], dtype=np.uint32)
+
+
+def _rotr(x, n):
+    return (x >> np.uint32(n)) | (x << np.uint32(32 - n))
+
+
+def compresser(etat, w):
+    """
+    Fonction de compression SHA256
+    `etat` : 8 mots uint32 (scalaires ou tableaux), `w` : 16 mots uint32 (scalaires ou tableaux de même taille)
+    """
+    w = list(w)
+    for t in range(16, 64):
+        s0 = _rotr(w[t - 15], 7) ^ _rotr(w[t - 15], 18) ^ (w[t - 15] >> np.uint32(3))
+        s1 = _rotr(w[t - 2], 17) ^ _rotr(w[t - 2], 19) ^ (w[t - 2] >> np.uint32(10))
+        w.append(w[t - 16] + s0 + w[t - 7] + s1)
+
+    a, b, c, d, e, f, g, h = etat
+    for t in range(64):
+        S1 = _rotr(e, 6) ^ _rotr(e, 11) ^ _rotr(e, 25)
+        ch = (e & f) ^ (~e & g)
+        temp1 = h + S1 + ch + K[t] + w[t]
+        S0 = _rotr(a, 2) ^ _rotr(a, 13) ^ _rotr(a, 22)
+        maj = (a & b) ^ (a & c) ^ (b & c)
+        temp2 = S0 + maj
+        h, g, f, e, d, c, b, a = g, f, e, d + temp1, c, b, a, temp1 + temp2
+
+    return [x + y for x, y in zip(etat, (a, b, c, d, e, f, g, h))]
+
+
+class RechercheNumpy:
+    """
+    Backend de minage vectorisé : le premier bloc de 64 octets du header est
+    compressé une seule fois (midstate), puis chaque appel hache un lot de nonces
+    """
+
+    def __init__(self, prefixe, taille_batch=16_384):
+        self.taille_batch = taille_batch
+        mots = np.frombuffer(prefixe, dtype='>u4').astype(np.uint32)
+        # Midstate : compression des 64 premiers octets du header (16 mots)
+        self.midstate = compresser([H0[i:i + 1] for i in range(8)], [mots[i:i + 1] for i in range(16)])
+        # Second bloc : 12 octets restants du préfixe, nonce, rembourrage (longueur = 80 octets)
+        self.fin_prefixe = [mots[i:i + 1] for i in range(16, 19)]
+
+    def hacher(self, nonces):
+        """ Double SHA256 d'un tableau de nonces, retourne les 8 mots (big-endian) de chaque hash """
+        # Le nonce est sérialisé en little-endian dans le header : on inverse ses octets pour obtenir le mot SHA256
+        mot_nonce = nonces.astype('<u4').byteswap()
+        zero = np.zeros_like(mot_nonce)
+        bloc2 = self.fin_prefixe + [mot_nonce, zero + np.uint32(0x80000000)] + [zero] * 10 + [zero + np.uint32(640)]
+        hash1 = compresser(self.midstate, bloc2)
+        hash2 = compresser([zero + x for x in H0], hash1 + [zero + x for x in PADDING_32_OCTETS])
+        return hash2
+
+    def chercher(self, cible, debut, fin):
+        """ Premier nonce de [debut, fin[ dont le hash est inférieur ou égal à la cible : (nonce, hash) ou None """
+        cible_mots = np.frombuffer(cible, dtype='>u4').astype(np.uint32)
+        for lot in range(debut, fin, self.taille_batch):
+            nonces = np.arange(lot, min(lot + self.taille_batch, fin), dtype=np.uint64)
+            mots = self.hacher(nonces)
+            # Comparaison lexicographique mot à mot (équivalente à la comparaison des octets)
+            inferieur = np.zeros(len(nonces), dtype=bool)
+            egal = np.ones(len(nonces), dtype=bool)
+            for mot, mot_cible in zip(mots, cible_mots):
+                inferieur |= egal & (mot < mot_cible)
+                egal &= mot == mot_cible
+            valides = np.flatnonzero(inferieur | egal)
+            if len(valides):
+                i = valides[0]
+                hash = b''.join(int(mot[i]).to_bytes(4, 'big') for mot in mots)
+                return int(nonces[i]), hash
+        return None
@@ -0,0 +1,144 @@
+from objects.bloc import Bloc
+import mmap
+import os
+import struct
+
+
+# Fichier de données : suite d'enregistrements taille (4 octets) | bloc sérialisé
+TAILLE_ENREGISTREMENT = struct.Struct("<I")
+# Fichier d'index : une entrée de taille fixe par bloc, index | hash | position dans le fichier de données
+ENTREE_INDEX = struct.Struct("<Q32sQ")
+
+
+class StockageBlocs:
+    """
+    Stockage binaire des blocs en ajout seul (blocs.dat) avec un index des positions (blocs.idx)
+    - chaque bloc est écrit au moment où il est ajouté à la chaîne
+    - l'index donne la position d'un bloc par numéro ou par hash
+    - la lecture passe par mmap : une position et une tranche, sans relire le fichier
+    """
+
+    def __init__(self, dossier, reinitialiser=False):
+        os.makedirs(dossier, exist_ok=True)
+        self.chemin_donnees = os.path.join(dossier, "blocs.dat")
+        self.chemin_index = os.path.join(dossier, "blocs.idx")
+        mode = "w+b" if reinitialiser else "a+b"
+        self._donnees = open(self.chemin_donnees, mode)
+        self._index = open(self.chemin_index, mode)
+        self._mmap = None
+        self._taille_mmap = 0
+
+        # Positions des blocs, par numéro et par hash
+        self.positions = []
+        self.hashs = []
+        self.par_hash = {}
+        self._charger_index()
+
+    def _charger_index(self):
+        """
+        Charge l'index sans relire les blocs : seule la fin est vérifiée (le dernier enregistrement indexé
+        doit tenir dans le fichier de données), en remontant l'index seulement si elle est incomplète
+        """
+        self._index.seek(0)
+        contenu = self._index.read()
+        entrees = list(ENTREE_INDEX.iter_unpack(contenu[:len(contenu) // ENTREE_INDEX.size * ENTREE_INDEX.size]))
+        taille_donnees = os.path.getsize(self.chemin_donnees)
+
+        # Bloc incomplet (arrêt pendant une écriture) : la fin des fichiers est ignorée puis tronquée
+        nb_valides, fin_valide = len(entrees), 0
+        while nb_valides:
+            fin = self._fin_enregistrement(entrees[nb_valides - 1][2], taille_donnees)
+            if fin is not None:
+                fin_valide = fin
+                break
+            nb_valides -= 1
+
+        for index, hash, position in entrees[:nb_valides]:
+            self.positions.append(position)
+            self.hashs.append(hash.hex())
+            self.par_hash[hash.hex()] = index
+        self._tronquer_fichiers(nb_valides, fin_valide)
+
+    def _fin_enregistrement(self, position, taille_donnees):
+        """ Fin de l'enregistrement écrit à `position`, ou None s'il dépasse la fin du fichier de données """
+        if position + TAILLE_ENREGISTREMENT.size > taille_donnees:
+            return None
+        self._donnees.seek(position)
+        taille, = TAILLE_ENREGISTREMENT.unpack(self._donnees.read(TAILLE_ENREGISTREMENT.size))
+        fin = position + TAILLE_ENREGISTREMENT.size + taille
+        return fin if fin <= taille_donnees else None
+
+    def ajouter(self, bloc):
+        """ Écrit un bloc à la fin du fichier de données puis son entrée d'index """
+        donnees = bloc.serialiser()
+        self._donnees.seek(0, os.SEEK_END)
+        position = self._donnees.tell()
+        self._donnees.write(TAILLE_ENREGISTREMENT.pack(len(donnees)) + donnees)
+        self._donnees.flush()
+
+        self._index.seek(0, os.SEEK_END)
+        self._index.write(ENTREE_INDEX.pack(len(self.positions), bytes.fromhex(bloc.hash), position))
+        self._index.flush()
+
+        self.positions.append(position)
+        self.hashs.append(bloc.hash)
+        self.par_hash[bloc.hash] = len(self.positions) - 1
+
+    def lire(self, cle):
+        """ Relit un bloc par numéro (int) ou par hash (str) """
+        index = self.par_hash[cle] if isinstance(cle, str) else cle
+        position = self.positions[index]
+        vue = self._vue()
+        taille, = TAILLE_ENREGISTREMENT.unpack_from(vue, position)
+        debut = position + TAILLE_ENREGISTREMENT.size
+        return Bloc.deserialiser(vue[debut:debut + taille])
+
+    def lire_tous(self):
+        return [self.lire(index) for index in range(len(self))]
+
+    def _vue(self):
+        """ Projection mémoire du fichier de données, refaite seulement s'il a grandi """
+        taille = os.path.getsize(self.chemin_donnees)
+        if self._mmap is None or taille > self._taille_mmap:
+            self._fermer_mmap()
+            self._mmap = mmap.mmap(self._donnees.fileno(), taille, access=mmap.ACCESS_READ)
+            self._taille_mmap = taille
+        return self._mmap
+
+    def tronquer(self, nb_blocs):
+        """ Ne garde que les `nb_blocs` premiers blocs (retrait d'un bloc de la chaîne) """
+        if nb_blocs >= len(self.positions):
+            return
+        fin = self.positions[nb_blocs]
+        for hash in self.hashs[nb_blocs:]:
+            del self.par_hash[hash]
+        del self.positions[nb_blocs:]
+        del self.hashs[nb_blocs:]
+        self._tronquer_fichiers(nb_blocs, fin)
+
+    def _tronquer_fichiers(self, nb_blocs, taille_donnees):
+        self._fermer_mmap()
+        self._donnees.truncate(taille_donnees)
+        self._donnees.flush()
+        self._index.truncate(nb_blocs * ENTREE_INDEX.size)
+        self._index.flush()
+
+    def _fermer_mmap(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+            self._taille_mmap = 0
+
+    def fermer(self):
+        self._fermer_mmap()
+        self._donnees.close()
+        self._index.close()
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
@@ -0,0 +1,104 @@
+from collections import deque
+import bisect
+import itertools
+import time
+
+
+def centile(valeurs, p):
+    """ Centile `p` (0 à 100) par rang, 0.0 pour une liste vide """
+    if not valeurs:
+        return 0.0
+    valeurs = sorted(valeurs)
+    return valeurs[min(int(p / 100 * len(valeurs)), len(valeurs) - 1)]
+
+
+class StatistiquesMineur:
+    """
+    Compteurs de minage publiés par un seul thread (celui qui mine) et lus sans verrou
+    par les autres (Simulation, interface) :
+    - le mineur publie par lots de nonces, jamais à chaque hash
+    - les lecteurs ne font que lire des attributs et copier la file d'échantillons
+    """
+
+    def __init__(self, nom, nb_echantillons=1024, pas_echantillon=0.1):
+        self.nom = nom
+        self.tentatives = 0
+        self.dernier_nonce = None
+        self.blocs_trouves = 0
+        self.debut_bloc = None
+        self.temps_solution = None
+        # Échantillons (instant, tentatives cumulées) pour les débits sur fenêtre glissante,
+        # espacés d'au moins `pas_echantillon` secondes (~100 s d'historique par défaut)
+        self._echantillons = deque(maxlen=nb_echantillons)
+        self._pas_echantillon = pas_echantillon
+        self._dernier_echantillon = 0.0
+
+    def demarrer_bloc(self):
+        self.debut_bloc = time.perf_counter()
+        self._echantillonner(self.debut_bloc)
+
+    def publier(self, tentatives, dernier_nonce=None):
+        """ Ajoute un lot de tentatives (appelé par le thread de minage uniquement) """
+        self.tentatives += tentatives
+        if dernier_nonce is not None:
+            self.dernier_nonce = dernier_nonce
+        maintenant = time.perf_counter()
+        if maintenant - self._dernier_echantillon >= self._pas_echantillon:
+            self._echantillonner(maintenant)
+
+    def _echantillonner(self, instant):
+        self._dernier_echantillon = instant
+        self._echantillons.append((instant, self.tentatives))
+
+    def solution_trouvee(self):
+        self.blocs_trouves += 1
+        if self.debut_bloc is not None:
+            self.temps_solution = time.perf_counter() - self.debut_bloc
+
+    def hashrate(self, fenetre=10.0):
+        """ Hashs par seconde sur les `fenetre` dernières secondes """
+        echantillons = self._echantillons.copy()
+        if not echantillons:
+            return 0.0
+        maintenant = time.perf_counter()
+        tentatives_fin = self.tentatives
+        instant_debut, tentatives_debut = echantillons[0]
+        for instant, tentatives in reversed(echantillons):
+            if instant <= maintenant - fenetre:
+                instant_debut, tentatives_debut = instant, tentatives
+                break
+        duree = maintenant - instant_debut
+        return (tentatives_fin - tentatives_debut) / duree if duree > 0 else 0.0
+
+    def instantane(self, fenetres=(1.0, 10.0, 60.0)):
+        """ Copie des compteurs, lisible depuis n'importe quel thread """
+        return {
+            'nom': self.nom,
+            'tentatives': self.tentatives,
+            'dernier_nonce': self.dernier_nonce,
+            'blocs_trouves': self.blocs_trouves,
+            'temps_solution': self.temps_solution,
+            'hashrate': {fenetre: self.hashrate(fenetre) for fenetre in fenetres},
+        }
+
+
+class Histogramme:
+    """
+    Histogramme cumulatif à bornes fixes (format Prometheus), alimenté par un seul thread
+    et lu sans verrou : un lecteur peut voir une observation de retard, jamais un état corrompu
+    """
+
+    def __init__(self, bornes):
+        self.bornes = tuple(sorted(bornes))
+        self.comptes = [0] * (len(self.bornes) + 1)
+        self.somme = 0.0
+        self.nombre = 0
+
+    def observer(self, valeur):
+        self.comptes[bisect.bisect_left(self.bornes, valeur)] += 1
+        self.somme += valeur
+        self.nombre += 1
+
+    def cumuls(self):
+        """ [(borne supérieure, nombre d'observations <= borne)], la dernière borne étant +inf """
+        return list(zip(self.bornes + (float('inf'),), itertools.accumulate(list(self.comptes))))
@@ -0,0 +1,133 @@
+"""
+Traceur de zones (spans) exporté au format Chrome Trace Event (chrome://tracing, Perfetto)
+
+Activé par la variable d'environnement BLOCKCHAIN_TRACE=<fichier.json> ou par `activer(fichier)` (option --trace) :
+- `@trace` mesure chaque appel d'une fonction, `zone(nom)` un bloc de code
+- chaque processus garde ses évènements en mémoire ; les processus de travail (pools de minage,
+  de vérification, de signature) écrivent les leurs dans <fichier>.<pid>.part à leur sortie
+- le processus principal fusionne le tout dans <fichier> à la fin de l'exécution
+Désactivé, une fonction tracée ne coûte qu'un test de booléen par appel
+"""
+
+from contextlib import contextmanager
+import atexit
+import functools
+import glob
+import json
+import multiprocessing.util
+import os
+import threading
+import time
+
+
+VARIABLE = "BLOCKCHAIN_TRACE"
+# Processus qui a activé le traçage (hérité par les processus de travail, seul à écrire le fichier final)
+VARIABLE_PRINCIPAL = "BLOCKCHAIN_TRACE_PRINCIPAL"
+
+_actif = False
+_fichier = None
+_pid = None
+_evenements = []
+_threads = {}
+
+
+def activer(fichier):
+    """ Active le traçage dans ce processus et dans les processus qu'il lancera """
+    global _actif, _fichier, _pid
+    os.environ[VARIABLE] = fichier
+    os.environ.setdefault(VARIABLE_PRINCIPAL, str(os.getpid()))
+    _actif, _fichier, _pid = True, fichier, os.getpid()
+    if est_principal():
+        atexit.register(exporter)
+    else:
+        multiprocessing.util.Finalize(None, _ecrire_partie, exitpriority=10)
+
+
+def est_actif():
+    return _actif
+
+
+def est_principal():
+    return os.environ.get(VARIABLE_PRINCIPAL) == str(os.getpid())
+
+
+def ajouter(nom, categorie, debut_ns, fin_ns):
+    """ Enregistre une zone terminée (instants de time.perf_counter_ns, horloge monotone commune aux processus) """
+    if os.getpid() != _pid:
+        # Processus créé par fork : les évènements hérités du parent ne sont pas les siens
+        _evenements.clear()
+        _threads.clear()
+        activer(_fichier)
+    thread = threading.get_native_id()
+    if thread not in _threads:
+        _threads[thread] = threading.current_thread().name
+    _evenements.append((nom, categorie, debut_ns, fin_ns, thread))
+
+
+@contextmanager
+def zone(nom, categorie="simulation"):
+    if not _actif:
+        yield
+        return
+    debut = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        ajouter(nom, categorie, debut, time.perf_counter_ns())
+
+
+def trace(fonction):
+    """ Décorateur : une zone par appel, nommée d'après la fonction, catégorie = module """
+    nom = fonction.__qualname__
+    categorie = fonction.__module__.rsplit('.', 1)[-1]
+
+    @functools.wraps(fonction)
+    def enveloppe(*args, **kwargs):
+        if not _actif:
+            return fonction(*args, **kwargs)
+        debut = time.perf_counter_ns()
+        try:
+            return fonction(*args, **kwargs)
+        finally:
+            ajouter(nom, categorie, debut, time.perf_counter_ns())
+    return enveloppe
+
+
+def _evenements_chrome():
+    """ Évènements de ce processus au format Chrome : zones complètes ("X") et noms des threads ("M") """
+    pid = os.getpid()
+    evenements = [
+        {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': thread, 'args': {'name': nom}}
+        for thread, nom in _threads.items()
+    ]
+    evenements.append({'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+                       'args': {'name': "principal" if est_principal() else f"travailleur {pid}"}})
+    evenements.extend(
+        {'name': nom, 'cat': categorie, 'ph': 'X', 'ts': debut / 1000, 'dur': (fin - debut) / 1000, 'pid': pid, 'tid': thread}
+        for nom, categorie, debut, fin, thread in _evenements
+    )
+    return evenements
+
+
+def _ecrire_partie():
+    if _evenements:
+        with open(f"{_fichier}.{os.getpid()}.part", 'w', encoding='utf-8') as f:
+            json.dump(_evenements_chrome(), f)
+
+
+def exporter(fichier=None):
+    """ Écrit le fichier de trace : évènements de ce processus et parties écrites par les processus de travail """
+    fichier = fichier or _fichier
+    evenements = _evenements_chrome()
+    for partie in glob.glob(glob.escape(fichier) + ".*.part"):
+        with open(partie, encoding='utf-8') as f:
+            evenements.extend(json.load(f))
+        os.remove(partie)
+    with open(fichier, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': evenements, 'displayTimeUnit': 'ms'}, f)
+    return fichier
+
+
+# Activation par variable d'environnement (y compris dans les processus lancés par spawn)
+if os.environ.get(VARIABLE):
+    activer(os.environ[VARIABLE])
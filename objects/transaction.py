@@ -1,20 +1,140 @@
-from objects.utilisateur import Utilisateur
+from objects.utilisateur import Participant, annuaire
 import hashlib
+import struct
 import time
 
 
+# Format binaire fixe d'une transaction, contenu signé :
+# clé expéditeur (33 octets, compressée) | clé destinataire | montant | frais | timestamp | système ?
+# suivi de la signature ECDSA brute (64 octets, à zéro pour une transaction système)
+FORMAT_CONTENU = struct.Struct("<33s33sdddB")
+TAILLE_SIGNATURE = 64
+TAILLE_TRANSACTION = FORMAT_CONTENU.size + TAILLE_SIGNATURE
+SIGNATURE_VIDE = bytes(TAILLE_SIGNATURE)
+
+# Montants exacts : les soldes sont cumulés en satoshis entiers plutôt qu'en flottants
+SATOSHIS_PAR_BTC = 100_000_000
+
+
+def en_satoshis(montant):
+    return round(montant * SATOSHIS_PAR_BTC)
+
+
+def en_btc(satoshis):
+    return satoshis / SATOSHIS_PAR_BTC
+
+
+# Une seule copie en mémoire de chaque clé de compte relue (partagée par toutes ses transactions)
+_cles_internees = {}
+
+
+def _interner(cle):
+    return _cles_internees.setdefault(cle, cle)
+
+
 class Transaction:
-    def __init__(self, expediteur, destinataire, montant, cle_publique_expediteur):
-        self.expediteur: Utilisateur = expediteur
-        self.destinataire: Utilisateur = destinataire
+    """
+    Transaction compacte : les comptes sont référencés par leur clé publique compressée,
+    le hash et la signature sont gardés en octets (les propriétés hexadécimales sont calculées à la demande)
+    """
+
+    __slots__ = ('cle_expediteur', 'cle_destinataire', 'montant', 'frais', 'timestamp', 'systeme', '_hash', '_signature')
+
+    def __init__(self, expediteur, destinataire, montant, cle_publique_expediteur, frais=0.0, timestamp=None):
+        self.cle_expediteur: bytes = expediteur.cle_publique_octets
+        self.cle_destinataire: bytes = destinataire.cle_publique_octets
         self.montant: float = montant
-        self.cle_publique = cle_publique_expediteur
-        self.timestamp = time.time()
-        self.contenu = f"{expediteur.cle_publique}{destinataire.cle_publique}{self.montant}{self.timestamp}"
-        self.hash_transaction = hashlib.sha256(self.contenu.encode()).hexdigest()
-        self.signature = None
+        # Frais payés par l'expéditeur au mineur qui inclut la transaction
+        self.frais: float = frais
+        self.systeme = cle_publique_expediteur == "SYSTEM"
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self._signature = None
+        self._hash = hashlib.sha256(self.contenu).digest()
+
+    @property
+    def contenu(self):
+        """ Octets signés par l'expéditeur (tout sauf la signature) """
+        return FORMAT_CONTENU.pack(
+            self.cle_expediteur, self.cle_destinataire, self.montant, self.frais, self.timestamp, self.systeme
+        )
+
+    def serialiser(self):
+        return self.contenu + (self._signature or SIGNATURE_VIDE)
+
+    @classmethod
+    def deserialiser(cls, donnees, position=0):
+        """ Relit une transaction à partir de `position`, retourne (transaction, position suivante) """
+        contenu = bytes(donnees[position:position + FORMAT_CONTENU.size])
+        signature = bytes(donnees[position + FORMAT_CONTENU.size:position + TAILLE_TRANSACTION])
+
+        tx = cls.__new__(cls)
+        (tx.cle_expediteur, tx.cle_destinataire, tx.montant, tx.frais,
+         tx.timestamp, systeme) = FORMAT_CONTENU.unpack(contenu)
+        tx.cle_expediteur = _interner(tx.cle_expediteur)
+        tx.cle_destinataire = _interner(tx.cle_destinataire)
+        tx.systeme = bool(systeme)
+        tx._signature = None if signature == SIGNATURE_VIDE else signature
+        tx._hash = hashlib.sha256(contenu).digest()
+        return tx, position + TAILLE_TRANSACTION
+
+    @property
+    def montant_satoshis(self):
+        return en_satoshis(self.montant)
+
+    @property
+    def frais_satoshis(self):
+        return en_satoshis(self.frais)
+
+    @property
+    def hash_transaction(self):
+        return self._hash.hex()
+
+    @property
+    def hash_octets(self):
+        return self._hash
+
+    @property
+    def signature(self):
+        return self._signature.hex() if self._signature else None
+
+    @signature.setter
+    def signature(self, signature_hex):
+        self._signature = bytes.fromhex(signature_hex) if signature_hex else None
+
+    @property
+    def cle_publique(self):
+        """ Clé publique hexadécimale qui vérifie la signature ("SYSTEM" pour une transaction système) """
+        return "SYSTEM" if self.systeme else self.cle_expediteur.hex()
+
+    @property
+    def expediteur(self):
+        return self._compte(self.cle_expediteur, "SYSTEM" if self.systeme else "inconnu")
+
+    @property
+    def destinataire(self):
+        return self._compte(self.cle_destinataire, "inconnu")
+
+    @staticmethod
+    def _compte(cle, nom_par_defaut):
+        """ Compte de ce processus correspondant à la clé, sinon un Participant anonyme """
+        cle_hex = cle.hex()
+        return annuaire.get(cle_hex) or Participant(nom_par_defaut, cle_hex)
+
+    @property
+    def est_systeme(self):
+        """Transaction sans signature émise par le protocole (récompense, genesis)"""
+        return self.systeme
+
+    @property
+    def taille(self):
+        """Taille en octets du format binaire (contenu + signature)"""
+        return TAILLE_TRANSACTION
+
+    @property
+    def taux_frais(self):
+        """Frais par octet, critère de priorité dans le mempool"""
+        return self.frais / self.taille
 
 
     def __str__(self):
         return f"Transaction : {self.expediteur.nom} -> {self.destinataire.nom} : {self.montant} BTC"
-
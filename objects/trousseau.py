@@ -0,0 +1,76 @@
+from objects.utilisateur import deriver_cle_privee, cle_publique_de
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+
+
+def _deriver_lot(graine, noms):
+    """ Paires (clé privée, clé publique) hexadécimales des comptes `noms` """
+    return [(cle_privee, cle_publique_de(cle_privee)) for cle_privee in (deriver_cle_privee(graine, nom) for nom in noms)]
+
+
+class TrousseauCles:
+    """
+    Cache sur disque des clés dérivées d'une graine (fichier JSON "graine/nom" -> [clé privée, clé publique])
+    - la clé publique, seule partie coûteuse de la dérivation, n'est calculée qu'une fois par compte
+    - `preparer` dérive en parallèle les clés manquantes d'une grande population
+    - `enregistrer` réécrit atomiquement le fichier s'il a changé (appelé par `fermer`)
+    Les clés privées sont écrites en clair : le trousseau ne sert qu'aux simulations
+    """
+
+    def __init__(self, fichier):
+        self.fichier = fichier
+        self.cles = {}
+        self.modifie = False
+        if os.path.exists(fichier):
+            with open(fichier, encoding='utf-8') as f:
+                self.cles = json.load(f)
+
+    def obtenir(self, graine, nom):
+        entree = self.cles.get(f"{graine}/{nom}")
+        if entree is None:
+            entree = self.cles[f"{graine}/{nom}"] = _deriver_lot(graine, [nom])[0]
+            self.modifie = True
+        return tuple(entree)
+
+    def preparer(self, graine, noms, nb_processus=None, taille_lot=1000):
+        """ Dérive à l'avance les clés absentes du trousseau, par lots répartis sur un pool de processus """
+        manquants = [nom for nom in noms if f"{graine}/{nom}" not in self.cles]
+        if not manquants:
+            return 0
+        lots = [manquants[i:i + taille_lot] for i in range(0, len(manquants), taille_lot)]
+        nb_processus = nb_processus or os.cpu_count() or 1
+        if nb_processus == 1 or len(lots) == 1:
+            resultats = [_deriver_lot(graine, lot) for lot in lots]
+        else:
+            with ProcessPoolExecutor(max_workers=nb_processus) as executeur:
+                resultats = list(executeur.map(_deriver_lot, [graine] * len(lots), lots))
+        for lot, paires in zip(lots, resultats):
+            for nom, paire in zip(lot, paires):
+                self.cles[f"{graine}/{nom}"] = paire
+        self.modifie = True
+        return len(manquants)
+
+    def enregistrer(self):
+        if not self.modifie:
+            return
+        os.makedirs(os.path.dirname(self.fichier) or ".", exist_ok=True)
+        temporaire = self.fichier + ".tmp"
+        with open(temporaire, 'w', encoding='utf-8') as f:
+            json.dump(self.cles, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporaire, self.fichier)
+        self.modifie = False
+
+    def fermer(self):
+        self.enregistrer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+    def __len__(self):
+        return len(self.cles)
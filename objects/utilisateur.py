@@ -1,25 +1,143 @@
 from ecdsa import SigningKey, VerifyingKey, SECP256k1
+from ecdsa.ellipticcurve import PointJacobi
+from objects.traceur import trace
+from collections import OrderedDict
 import binascii
+import hashlib
+import threading
 
 
-class Utilisateur:
+class CacheClesPubliques:
+    """
+    Cache LRU borné des clés publiques déjà parsées (hexadécimal -> VerifyingKey)
+    Une clé utilisée au moins `seuil_precalcul` fois reçoit une table de précalcul ecdsa,
+    qui divise environ par deux le coût de ses vérifications suivantes
+    """
+
+    def __init__(self, taille_max=1024, seuil_precalcul=8):
+        self.taille_max = taille_max
+        self.seuil_precalcul = seuil_precalcul
+        self._cles = OrderedDict()
+        self._verrou = threading.Lock()
+
+    def obtenir(self, cle_publique_hex):
+        with self._verrou:
+            entree = self._cles.get(cle_publique_hex)
+            if entree is None:
+                cle = VerifyingKey.from_string(binascii.unhexlify(cle_publique_hex), curve=SECP256k1)
+                entree = self._cles[cle_publique_hex] = [cle, 0]
+                if len(self._cles) > self.taille_max:
+                    self._cles.popitem(last=False)
+            else:
+                self._cles.move_to_end(cle_publique_hex)
+            entree[1] += 1
+            if entree[1] == self.seuil_precalcul:
+                entree[0] = self._precalculer(entree[0])
+            return entree[0]
+
+    @staticmethod
+    def _precalculer(cle):
+        # Le point doit connaître l'ordre de la courbe pour que ecdsa accepte de précalculer ses multiples
+        point = cle.pubkey.point
+        point = PointJacobi(SECP256k1.curve, point.x(), point.y(), 1, SECP256k1.order, generator=True)
+        cle = VerifyingKey.from_public_point(point, curve=SECP256k1)
+        cle.precompute()
+        return cle
+
+
+cles_publiques = CacheClesPubliques()
+
+# Comptes connus dans ce processus, par clé publique hexadécimale (pour relire les blocs sauvegardés)
+annuaire = {}
+
+
+def deriver_cle_privee(graine, nom):
+    """ Clé privée (hexadécimale) déterminée par la graine et le nom du compte : mêmes comptes à chaque exécution """
+    empreinte = int.from_bytes(hashlib.sha256(f"{graine}/{nom}".encode('utf-8')).digest(), 'big')
+    return f"{empreinte % (SECP256k1.order - 1) + 1:064x}"
+
+
+def cle_publique_de(cle_privee_hex):
+    """ Clé publique compressée (hexadécimale) d'une clé privée hexadécimale """
+    cle = SigningKey.from_string(binascii.unhexlify(cle_privee_hex), curve=SECP256k1)
+    return binascii.hexlify(cle.get_verifying_key().to_string("compressed")).decode('ascii')
+
+
+class CompteSysteme:
+    """
+    Expéditeur des transactions émises par le protocole (genesis, récompenses) : un seul objet par nom,
+    sans paire de clés ; son identifiant de 33 octets commence par 0x00, qui n'est le préfixe
+    d'aucune clé publique compressée (0x02 ou 0x03)
+    """
+
     def __init__(self, nom):
         self.nom = nom
-        # Génération de la clé privée (nombre aléatoire secret)
-        self.cle_privee = SigningKey.generate(curve=SECP256k1)
-        # Dérivation de la clé publique à partir de la clé privée
-        self.cle_publique = self.cle_privee.get_verifying_key()
-        # Clé publique en format hexadécimal
-        self.cle_publique_hex = binascii.hexlify(self.cle_publique.to_string()).decode('ascii')
+        self.cle_publique_octets = b"\x00" + hashlib.sha256(nom.encode('utf-8')).digest()
+        self.cle_publique_hex = self.cle_publique_octets.hex()
+        annuaire[self.cle_publique_hex] = self
+
+    def __str__(self):
+        return f"{self.nom} (système)"
+
+
+GENESIS = CompteSysteme("GENESIS")
+RECOMPENSE = CompteSysteme("RECOMPENSE")
+
+
+class Utilisateur:
+    """
+    Compte avec sa paire de clés ECDSA (SECP256k1)
+    - clé aléatoire par défaut, clé restaurée avec `cle_privee_hex`, ou clé dérivée de `graine` et du nom
+    - avec un `trousseau` (objects.trousseau), les clés dérivées sont relues depuis le disque
+    Les objets ecdsa ne sont construits qu'à la première signature ou vérification
+    """
+
+    def __init__(self, nom, cle_privee_hex=None, graine=None, trousseau=None):
+        self.nom = nom
+        self._cle_privee = None
+        self._cle_publique = None
+        cle_publique_hex = None
+        if cle_privee_hex is None and graine is not None:
+            if trousseau is not None:
+                cle_privee_hex, cle_publique_hex = trousseau.obtenir(graine, nom)
+            else:
+                cle_privee_hex = deriver_cle_privee(graine, nom)
+        if cle_privee_hex is None:
+            # Génération de la clé privée (nombre aléatoire secret)
+            self._cle_privee = SigningKey.generate(curve=SECP256k1)
+            cle_privee_hex = binascii.hexlify(self._cle_privee.to_string()).decode('ascii')
+        self._cle_privee_hex = cle_privee_hex
+        # Clé publique compressée (33 octets), identifiant du compte, et son format hexadécimal
+        if cle_publique_hex is None:
+            self._cle_publique = self.cle_privee.get_verifying_key()
+            cle_publique_hex = binascii.hexlify(self._cle_publique.to_string("compressed")).decode('ascii')
+        self.cle_publique_hex = cle_publique_hex
+        self.cle_publique_octets = bytes.fromhex(cle_publique_hex)
+        annuaire[self.cle_publique_hex] = self
+
+    @property
+    def cle_privee(self):
+        if self._cle_privee is None:
+            self._cle_privee = SigningKey.from_string(binascii.unhexlify(self._cle_privee_hex), curve=SECP256k1)
+        return self._cle_privee
+
+    @property
+    def cle_publique(self):
+        if self._cle_publique is None:
+            self._cle_publique = self.cle_privee.get_verifying_key()
+        return self._cle_publique
+
+    @property
+    def cle_privee_hex(self):
+        return self._cle_privee_hex
     
+    @trace
     def signe(self, transaction):
         """
         Signer une transaction avec la clé privée (ECDSA)
         """
-        # Créer le message à partir des données de la transaction
-        message = f"{transaction.expediteur}{transaction.destinataire}{transaction.montant}{transaction.timestamp}"
-        message_bytes = message.encode('utf-8')
-        signature = self.cle_privee.sign(message_bytes)
+        # Le message signé est le contenu binaire de la transaction, celui que vérifient les mineurs
+        signature = self.cle_privee.sign(transaction.contenu)
         # Stocker la signature dans la transaction
         return binascii.hexlify(signature).decode('ascii')
     
@@ -30,10 +148,9 @@ class Utilisateur:
         Méthode statique car n'importe qui peut vérifier
         """
         try:
-            cle_pub_bytes = binascii.unhexlify(cle_publique_hex)
-            cle_publique = VerifyingKey.from_string(cle_pub_bytes, curve=SECP256k1)
+            cle_publique = cles_publiques.obtenir(cle_publique_hex)
             signature_bytes = binascii.unhexlify(signature)
-            message_bytes = message.encode('utf-8')
+            message_bytes = message.encode('utf-8') if isinstance(message, str) else message
             return cle_publique.verify(signature_bytes, message_bytes)
         except:
             return False
@@ -41,3 +158,24 @@ class Utilisateur:
     def __str__(self):
         return f"{self.nom} ({self.cle_publique_hex[:20]}...)"
 
+
+class Participant:
+    """
+    Compte connu seulement par son nom et sa clé publique (sans clé privée),
+    utilisé pour les transactions dont le compte n'est pas dans l'annuaire
+    """
+
+    def __init__(self, nom, cle_publique_hex):
+        self.nom = nom
+        self.cle_publique_hex = cle_publique_hex
+
+    @property
+    def cle_publique(self):
+        return cles_publiques.obtenir(self.cle_publique_hex)
+
+    @property
+    def cle_publique_octets(self):
+        return bytes.fromhex(self.cle_publique_hex)
+
+    def __str__(self):
+        return f"{self.nom} ({self.cle_publique_hex[:20]}...)"
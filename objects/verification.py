@@ -0,0 +1,168 @@
+from objects.utilisateur import Utilisateur, GENESIS, RECOMPENSE
+from objects.transaction import en_satoshis
+from objects.traceur import trace
+from concurrent.futures import ProcessPoolExecutor
+from collections import OrderedDict
+import threading
+import os
+
+
+class CacheSignatures:
+    """
+    Cache LRU borné des transactions dont la signature a déjà été vérifiée (hash_transaction -> signature)
+    Une transaction vérifiée à son entrée dans le mempool n'est pas revérifiée lors de la validation du bloc
+    """
+
+    def __init__(self, taille_max=100_000):
+        self.taille_max = taille_max
+        self._signatures = OrderedDict()
+        self._verrou = threading.Lock()
+
+    def est_verifiee(self, tx):
+        with self._verrou:
+            signature = self._signatures.get(tx.hash_transaction)
+            if signature is None or signature != tx.signature:
+                return False
+            self._signatures.move_to_end(tx.hash_transaction)
+            return True
+
+    def ajouter(self, tx):
+        with self._verrou:
+            self._signatures[tx.hash_transaction] = tx.signature
+            self._signatures.move_to_end(tx.hash_transaction)
+            if len(self._signatures) > self.taille_max:
+                self._signatures.popitem(last=False)
+
+    def vider(self):
+        with self._verrou:
+            self._signatures.clear()
+
+
+cache_signatures = CacheSignatures()
+
+# Signatures effectivement vérifiées (hors cache) par ce processus ou pour son compte, lu par objects.metriques
+signatures_verifiees = 0
+
+
+def verifier_transaction(tx, cache=cache_signatures):
+    """ Vérifie la signature d'une transaction, sauf si elle est déjà dans le cache """
+    global signatures_verifiees
+    if cache.est_verifiee(tx):
+        return True
+    signatures_verifiees += 1
+    valide = Utilisateur.verifier_signature(tx.cle_publique, tx.contenu, tx.signature)
+    if valide:
+        cache.ajouter(tx)
+    return valide
+
+
+def est_emission(tx):
+    """ Transaction émise par le protocole : marquée système ET envoyée par un compte système (récompense ou genesis) """
+    return tx.est_systeme and tx.cle_expediteur in (RECOMPENSE.cle_publique_octets, GENESIS.cle_publique_octets)
+
+
+def verifier_emissions(bloc, recompense):
+    """
+    Règles des transactions système d'un bloc :
+    - au plus une récompense (coinbase), envoyée par RECOMPENSE, d'un montant au plus égal
+      à la récompense du bloc plus les frais de ses autres transactions
+    - des transactions GENESIS uniquement dans le bloc 0
+    - aucune autre transaction marquée système (elles passent sinon par la vérification des signatures)
+    """
+    ordinaires = [tx for tx in bloc.transactions if not tx.est_systeme]
+    recompenses = [tx for tx in bloc.transactions if tx.est_systeme and tx.cle_expediteur == RECOMPENSE.cle_publique_octets]
+    genesis = [tx for tx in bloc.transactions if tx.est_systeme and tx.cle_expediteur == GENESIS.cle_publique_octets]
+    if len(ordinaires) + len(recompenses) + len(genesis) != len(bloc.transactions):
+        return False
+    if len(recompenses) > 1 or (genesis and bloc.index != 0):
+        return False
+    # Même somme flottante que Mineur.construire_bloc, donc même arrondi en satoshis
+    maximum = en_satoshis(recompense + sum(tx.frais for tx in ordinaires))
+    return all(tx.montant_satoshis <= maximum for tx in recompenses)
+
+
+def transactions_a_verifier(blocs):
+    """ Transactions signées (hors récompense et genesis) d'un ou plusieurs blocs """
+    return [tx for bloc in blocs for tx in bloc.transactions if not est_emission(tx)]
+
+
+@trace
+def _verifier_lot(lot, arret_premier_echec):
+    """ Vérifie un lot de (clé publique, contenu, signature), en s'arrêtant au premier échec si demandé """
+    resultats = []
+    for cle_publique, contenu, signature in lot:
+        valide = Utilisateur.verifier_signature(cle_publique, contenu, signature)
+        resultats.append(valide)
+        if not valide and arret_premier_echec:
+            break
+    return resultats
+
+
+class VerificateurSignatures:
+    """
+    Vérification ECDSA par lots, répartie sur un pool de processus
+    Les petits volumes (moins d'un lot) sont vérifiés directement dans le processus appelant
+    """
+
+    def __init__(self, nb_processus=None, taille_lot=64, cache=cache_signatures):
+        self.nb_processus = nb_processus or os.cpu_count() or 1
+        self.taille_lot = taille_lot
+        self.cache = cache
+        self._executeur = None
+
+    def _pool(self):
+        if self._executeur is None:
+            self._executeur = ProcessPoolExecutor(max_workers=self.nb_processus)
+        return self._executeur
+
+    def verifier(self, transactions, arret_premier_echec=False):
+        """
+        Retourne un résultat par transaction : True/False, ou None si la vérification
+        a été interrompue avant (arret_premier_echec)
+        Seules les transactions absentes du cache de signatures sont envoyées aux processus
+        """
+        global signatures_verifiees
+        transactions = list(transactions)
+        resultats = [True if self.cache.est_verifiee(tx) else None for tx in transactions]
+        a_verifier = [i for i, resultat in enumerate(resultats) if resultat is None]
+        entrees = [(transactions[i].cle_publique, transactions[i].contenu, transactions[i].signature) for i in a_verifier]
+        lots = [entrees[i:i + self.taille_lot] for i in range(0, len(entrees), self.taille_lot)]
+
+        if self.nb_processus == 1 or len(lots) <= 1:
+            futures = None
+            lots_verifies = (_verifier_lot(lot, arret_premier_echec) for lot in lots)
+        else:
+            pool = self._pool()
+            futures = [pool.submit(_verifier_lot, lot, arret_premier_echec) for lot in lots]
+            lots_verifies = (future.result() for future in futures)
+
+        # Les lots sont relus dans l'ordre pour que les résultats restent alignés sur les transactions
+        verifies = []
+        for resultats_lot in lots_verifies:
+            verifies.extend(resultats_lot)
+            if arret_premier_echec and not all(resultats_lot):
+                if futures is not None:
+                    for future in futures:
+                        future.cancel()
+                break
+
+        signatures_verifiees += len(verifies)
+        for i, valide in zip(a_verifier, verifies):
+            resultats[i] = valide
+            if valide:
+                self.cache.ajouter(transactions[i])
+        return resultats
+
+    def verifier_blocs(self, blocs, arret_premier_echec=False):
+        return self.verifier(transactions_a_verifier(blocs), arret_premier_echec)
+
+    def fermer(self):
+        if self._executeur is not None:
+            self._executeur.shutdown(wait=True, cancel_futures=True)
+            self._executeur = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
@@ -0,0 +1,48 @@
+from objects.arbre_blocs import ArbreBlocs
+from objects.difficulte import bits_depuis_zeros
+from types import SimpleNamespace
+
+
+BITS = bits_depuis_zeros(1)
+
+
+def bloc(nom, precedent, hauteur):
+    return SimpleNamespace(hash=nom, hash_precedent=precedent, index=hauteur, bits=BITS)
+
+
+def arbre_avec_branche_invalide():
+    """ Chaîne active G-T1-T2 et branche A-B-C partant de G, où B est invalide """
+    chaine = [bloc("G", "0", 0)]
+    arbre = ArbreBlocs(chaine, valider=lambda b, precedent: b.hash != "B")
+    arbre.ajouter(bloc("T1", "G", 1))
+    arbre.ajouter(bloc("T2", "T1", 2))
+    arbre.ajouter(bloc("A", "G", 1))
+    arbre.ajouter(bloc("B", "A", 2))
+    assert arbre.ajouter(bloc("C", "B", 3)) == ([], [])
+    return arbre, chaine
+
+
+def test_reorganisation_vers_branche_invalide_refusee():
+    arbre, chaine = arbre_avec_branche_invalide()
+    assert [b.hash for b in chaine] == ["G", "T1", "T2"]
+    assert {"B", "C"} <= arbre.invalides
+    assert "A" in arbre.hors_chaine and "C" not in arbre.hors_chaine
+
+    # Prolonger la branche invalide ne provoque ni erreur ni réorganisation
+    assert arbre.ajouter(bloc("D", "C", 4)) == ([], [])
+    assert "D" in arbre.invalides
+    assert [b.hash for b in chaine] == ["G", "T1", "T2"]
+
+
+def test_orphelins_d_un_bloc_invalide_ecartes():
+    arbre, chaine = arbre_avec_branche_invalide()
+    # E attend son parent D, qui arrive ensuite au-dessus de la branche invalide
+    arbre.ajouter(bloc("E", "D", 5))
+    arbre.ajouter(bloc("D", "C", 4))
+    assert {"D", "E"} <= arbre.invalides and not arbre.orphelins
+
+    # La branche valide A-A2-A3 l'emporte toujours
+    arbre.ajouter(bloc("A2", "A", 2))
+    retires, ajoutes = arbre.ajouter(bloc("A3", "A2", 3))
+    assert [b.hash for b in retires] == ["T2", "T1"] and [b.hash for b in ajoutes] == ["A", "A2", "A3"]
+    assert [b.hash for b in chaine] == ["G", "A", "A2", "A3"]
@@ -0,0 +1,25 @@
+from main import Simulation
+from objects.verification import cache_signatures
+
+
+def simulation(**options):
+    simulation = Simulation("evenements", nb_processus=1, hashrates=[1_000_000] * 20, graine=1)
+    for cle, valeur in options.items():
+        setattr(simulation, cle, valeur)
+    return simulation
+
+
+def test_transactions_signees_a_l_avance():
+    sim = simulation()
+    resume = sim.run(5)
+    assert len(sim.blockchain) == 6 and resume['transactions'] > 0
+    transactions = [tx for bloc in sim.blockchain[1:] for tx in bloc.transactions if not tx.est_systeme]
+    assert transactions and all(cache_signatures.est_verifiee(tx) for tx in transactions)
+
+
+def test_signatures_simulees():
+    sim = simulation(signatures_simulees=True)
+    sim.run(50)
+    assert len(sim.blockchain) == 51
+    transactions = [tx for bloc in sim.blockchain[1:] for tx in bloc.transactions if not tx.est_systeme]
+    assert transactions and all(tx.signature is None for tx in transactions)
@@ -0,0 +1,32 @@
+from objects.minage import MoteurMinage, repartir_nonces, NONCE_MAX
+from objects.telemetrie import StatistiquesMineur
+import time
+
+
+def test_repartition_plus_de_headers_que_de_processus():
+    taches = repartir_nonces(4, 2)
+    assert len(taches) == 2
+    assert [sorted(indice for indice, _, _ in tache) for tache in taches] == [[0, 2], [1, 3]]
+    for indice in range(4):
+        tranches = sorted((debut, fin) for tache in taches for i, debut, fin in tache if i == indice)
+        assert tranches == [(0, NONCE_MAX)]
+
+
+def test_repartition_plus_de_processus_que_de_headers():
+    taches = repartir_nonces(2, 4)
+    assert len(taches) == 4 and all(len(tache) == 1 for tache in taches)
+    for indice in range(2):
+        tranches = sorted((debut, fin) for tache in taches for i, debut, fin in tache if i == indice)
+        assert tranches[0][0] == 0 and tranches[-1][1] == NONCE_MAX
+        assert all(fin == debut for (_, fin), (debut, _) in zip(tranches, tranches[1:]))
+
+
+def test_tous_les_mineurs_progressent_avec_moins_de_processus():
+    """ 4 headers candidats sur 2 processus, cible impossible : chaque mineur doit accumuler des tentatives """
+    statistiques = [StatistiquesMineur(f"Mineur_{i}") for i in range(4)]
+    entetes = [bytes([i]) * 76 for i in range(4)]
+    fin = time.monotonic() + 1.0
+    with MoteurMinage(2, taille_lot=100) as moteur:
+        resultat = moteur.miner(entetes, bytes(32), lambda: time.monotonic() < fin, statistiques)
+    assert resultat is None
+    assert all(stats.tentatives > 0 for stats in statistiques)
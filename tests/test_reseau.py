@@ -0,0 +1,54 @@
+from objects.reseau import Reseau
+
+
+def reseau_espionne():
+    """ Petit réseau dont le nœud 1 note les blocs qu'il relaie au lieu de les envoyer """
+    reseau = Reseau(nb_noeuds=3, degre=2, nb_utilisateurs=2, graine=1)
+    noeud = reseau.noeuds[1]
+    relayes = []
+    noeud.diffuser = lambda objet, origine=None: relayes.append(objet.hash)
+    return reseau, noeud, relayes
+
+
+def bloc_suivant(reseau, noeud, precedent, recompense=None):
+    bloc = noeud.mineur.construire_bloc(
+        hash_dernier_bloc=precedent.hash,
+        index_bloc=precedent.index + 1,
+        recompense=reseau.recompense_bloc if recompense is None else recompense,
+        bits=reseau.reciblage.prochains_bits(noeud.blockchain)
+    )
+    bloc.timestamp = precedent.timestamp + 1
+    bloc.nonce = 0
+    bloc.hash = noeud.mineur.calculer_hash(bloc, bloc.nonce)
+    # Bloc miné par le nœud qui le reçoit : pas de mesure de propagation
+    reseau.mines[bloc.hash] = (0.0, noeud.numero)
+    reseau.receptions[bloc.hash] = []
+    return bloc
+
+
+def test_bloc_invalide_non_relaye():
+    reseau, noeud, relayes = reseau_espionne()
+    genesis = noeud.blockchain[-1]
+    frauduleux = bloc_suivant(reseau, noeud, genesis, recompense=1000)
+    noeud.recevoir(frauduleux)
+    assert relayes == []
+    assert frauduleux.hash in noeud.arbre.invalides
+
+    valide = bloc_suivant(reseau, noeud, genesis)
+    noeud.recevoir(valide)
+    assert relayes == [valide.hash]
+
+
+def test_orphelin_relaye_quand_son_parent_arrive():
+    reseau, noeud, relayes = reseau_espionne()
+    genesis = noeud.blockchain[-1]
+    parent = bloc_suivant(reseau, noeud, genesis)
+    noeud.blockchain.append(parent)
+    enfant = bloc_suivant(reseau, noeud, parent)
+    noeud.blockchain.pop()
+
+    noeud.recevoir(enfant)
+    assert relayes == []
+    noeud.recevoir(parent)
+    assert relayes == [parent.hash, enfant.hash]
+    assert noeud.blockchain[-1].hash == enfant.hash
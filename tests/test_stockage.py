@@ -0,0 +1,51 @@
+from objects.stockage import StockageBlocs, ENTREE_INDEX
+from objects.mineur import Mineur
+import os
+import pytest
+
+
+@pytest.fixture(scope="module")
+def blocs():
+    mineur = Mineur("Mineur", graine=1)
+    chaine = [mineur.miner_bloc(difficulte=1)]
+    for _ in range(4):
+        chaine.append(mineur.miner_bloc([], chaine[-1].hash, len(chaine), difficulte=1))
+    return chaine
+
+
+def ecrire(dossier, blocs):
+    with StockageBlocs(dossier, reinitialiser=True) as stockage:
+        for bloc in blocs:
+            stockage.ajouter(bloc)
+    return os.path.getsize(os.path.join(dossier, "blocs.dat"))
+
+
+def test_relecture(tmp_path, blocs):
+    ecrire(tmp_path, blocs)
+    with StockageBlocs(tmp_path) as stockage:
+        assert stockage.hashs == [bloc.hash for bloc in blocs]
+        assert stockage.lire(blocs[2].hash).hash == blocs[2].hash
+
+
+def test_bloc_ecrit_sans_entree_d_index(tmp_path, blocs):
+    taille = ecrire(tmp_path, blocs)
+    with open(os.path.join(tmp_path, "blocs.dat"), "ab") as f:
+        f.write(b"\x10\x00\x00\x00incomplet")
+    with StockageBlocs(tmp_path) as stockage:
+        assert len(stockage) == len(blocs)
+    assert os.path.getsize(os.path.join(tmp_path, "blocs.dat")) == taille
+
+
+def test_bloc_indexe_incomplet(tmp_path, blocs):
+    ecrire(tmp_path, blocs)
+    with StockageBlocs(tmp_path, reinitialiser=False) as stockage:
+        fin_avant_dernier = stockage.positions[-1]
+    # Données du dernier bloc coupées en cours d'écriture, son entrée d'index présente
+    with open(os.path.join(tmp_path, "blocs.dat"), "r+b") as f:
+        f.truncate(fin_avant_dernier + 10)
+    with StockageBlocs(tmp_path) as stockage:
+        assert stockage.hashs == [bloc.hash for bloc in blocs[:-1]]
+        stockage.ajouter(blocs[-1])
+    assert os.path.getsize(os.path.join(tmp_path, "blocs.idx")) == len(blocs) * ENTREE_INDEX.size
+    with StockageBlocs(tmp_path) as stockage:
+        assert stockage.lire(len(blocs) - 1).hash == blocs[-1].hash
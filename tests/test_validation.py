@@ -0,0 +1,44 @@
+from objects.utilisateur import Utilisateur, GENESIS, RECOMPENSE
+from objects.transaction import Transaction
+from objects.mineur import Mineur
+import pytest
+
+
+@pytest.fixture(scope="module")
+def comptes():
+    alice, bob = Utilisateur("Alice", graine=1), Utilisateur("Bob", graine=1)
+    mineur = Mineur("Mineur", graine=1)
+    genesis = mineur.creer_bloc_genesis([alice, bob])
+    return alice, bob, mineur, genesis
+
+
+def miner(mineur, precedent, transactions, recompense=3.125):
+    return mineur.miner_bloc(transactions, precedent.hash, precedent.index + 1, recompense, difficulte=1)
+
+
+def test_bloc_valide_accepte(comptes):
+    alice, bob, mineur, genesis = comptes
+    tx = Transaction(alice, bob, 1.0, alice.cle_publique, frais=0.5)
+    tx.signature = alice.signe(tx)
+    assert mineur.valider_bloc(miner(mineur, genesis, [tx]), genesis)
+
+
+def test_transaction_systeme_forgee_rejetee(comptes):
+    alice, bob, mineur, genesis = comptes
+    # Marquée "SYSTEM" mais envoyée par un utilisateur : ni signature ni solde ne la couvrent
+    forgee = Transaction(alice, bob, 1_000.0, "SYSTEM")
+    assert not mineur.valider_bloc(miner(mineur, genesis, [forgee]), genesis)
+
+
+def test_genesis_hors_bloc_0_rejete(comptes):
+    _, bob, mineur, genesis = comptes
+    creation = Transaction(GENESIS, bob, 1_000.0, "SYSTEM")
+    assert not mineur.valider_bloc(miner(mineur, genesis, [creation]), genesis)
+
+
+def test_recompense_bornee(comptes):
+    alice, bob, mineur, genesis = comptes
+    assert not mineur.valider_bloc(miner(mineur, genesis, [], recompense=50.0), genesis)
+
+    seconde = Transaction(RECOMPENSE, bob, 1.0, "SYSTEM")
+    assert not mineur.valider_bloc(miner(mineur, genesis, [seconde]), genesis)